@@ -12,7 +12,9 @@ from dotenv import load_dotenv
 
 # Changed relative imports to absolute imports
 import models, schemas
-from database import get_db
+from database import get_session, run_db
+from executors import BoundedExecutor
+from user_cache import user_cache, attach
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +26,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt so login bursts cannot starve the request threadpool.
+# PASSWORD_EXECUTOR is "thread" or "process"; PASSWORD_QUEUE_DEPTH is how many
+# calls may wait for a worker before new ones are rejected.
+PASSWORD_EXECUTOR = os.getenv("PASSWORD_EXECUTOR", "thread").lower()
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 2))
+PASSWORD_QUEUE_DEPTH = int(os.getenv("PASSWORD_QUEUE_DEPTH", 32))
+
 # OAuth2PasswordBearer for token extraction from headers
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -39,6 +48,16 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+password_pool = BoundedExecutor("password", PASSWORD_WORKERS, PASSWORD_QUEUE_DEPTH, PASSWORD_EXECUTOR)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a password on the password pool without blocking the event loop."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hashes a password on the password pool without blocking the event loop."""
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Creates a JWT access token.
@@ -52,46 +71,81 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """
-    Dependency to get the current authenticated user from the JWT token.
-    Raises HTTPException if token is invalid or user not found.
-    """
-    credentials_exception = HTTPException(
+def _load_user(db: Session, user_id: int):
+    return db.query(models.User).filter(models.User.id == user_id).first()
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def token_claims(user: models.User) -> dict:
+    """The JWT claims issued for a user at login."""
+    return {"id": user.id, "email": user.email, "role": user.role, "ver": user.token_version or 0}
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> schemas.TokenData:
+    """
+    Dependency returning the verified claims of the JWT token, without touching the database.
+    Raises HTTPException if the token is invalid.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("id")
         user_email: str = payload.get("email")
         user_role: str = payload.get("role")
         if user_id is None or user_email is None or user_role is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(id=user_id, email=user_email, role=user_role)
+            raise _credentials_exception()
+        return schemas.TokenData(id=user_id, email=user_email, role=user_role, ver=payload.get("ver", 0))
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.query(models.User).filter(models.User.id == token_data.id).first()
-    if user is None:
-        raise credentials_exception
+async def get_current_user(token_data: schemas.TokenData = Depends(get_token_claims), db: Session = Depends(get_session)):
+    """
+    Dependency to get the current authenticated user from the JWT token.
+    Served from the per-process user cache when possible.
+    Raises HTTPException if token is invalid, revoked, or user not found.
+    """
+    snapshot = user_cache.get(token_data.id, token_data.ver)
+    if snapshot is not None:
+        return await run_db(db, attach, snapshot)
+
+    user = await run_db(db, _load_user, token_data.id)
+    if user is None or (user.token_version or 0) != token_data.ver:
+        raise _credentials_exception()
+    user_cache.put(user)
     return user
 
-def get_current_active_student(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_student(current_user: models.User = Depends(get_current_user)):
     """Dependency to ensure the current user is an active student."""
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Not authorized as a student")
     return current_user
 
-def get_current_active_employer(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_employer(current_user: models.User = Depends(get_current_user)):
     """Dependency to ensure the current user is an active employer."""
     if current_user.role != "employer":
         raise HTTPException(status_code=403, detail="Not authorized as an employer")
     return current_user
 
-def get_current_active_admin(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_admin(current_user: models.User = Depends(get_current_user)):
     """Dependency to ensure the current user is an active admin."""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized as an admin")
     return current_user
+
+# Claims-only role checks for cheap reads that need nothing but the caller's id and role.
+# They skip the user lookup entirely, so a deleted user or revoked token keeps
+# passing them until the token expires. Use the user dependencies above for writes
+# and for every admin route, which must stop working as soon as access is revoked.
+
+def _require_role(role: str, detail: str):
+    async def dependency(claims: schemas.TokenData = Depends(get_token_claims)) -> schemas.TokenData:
+        if claims.role != role:
+            raise HTTPException(status_code=403, detail=detail)
+        return claims
+    return dependency
+
+student_claims = _require_role("student", "Not authorized as a student")
+employer_claims = _require_role("employer", "Not authorized as an employer")
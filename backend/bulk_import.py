@@ -0,0 +1,169 @@
+# backend/bulk_import.py
+
+import codecs
+import csv
+import json
+import os
+
+from pydantic import ValidationError
+
+import crud_async, schemas
+
+# Rows inserted per statement/COPY and per commit, and how many row errors are
+# kept for the report (the rest are only counted, so memory stays flat).
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 1000))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", 1000))
+# Longest line, or CSV record with quoted newlines, accepted; anything longer is
+# reported as a row error and skipped, so one stray quote cannot buffer the rest
+# of the upload.
+BULK_IMPORT_MAX_RECORD_LENGTH = int(os.getenv("BULK_IMPORT_MAX_RECORD_LENGTH", 64 * 1024))
+
+FORMATS = ("csv", "ndjson")
+
+class UnsupportedFormat(ValueError):
+    """Raised when the upload is neither CSV nor NDJSON."""
+
+def detect_format(content_type: str, requested: str = None) -> str:
+    """Picks the upload format from an explicit `format` parameter or the Content-Type."""
+    if requested:
+        if requested.lower() not in FORMATS:
+            raise UnsupportedFormat(f"Unsupported format '{requested}', expected one of: {', '.join(FORMATS)}")
+        return requested.lower()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    raise UnsupportedFormat("Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+
+# --- Streaming parsers ---
+
+async def _lines(chunks, max_length: int = BULK_IMPORT_MAX_RECORD_LENGTH):
+    """
+    Decodes a stream of byte chunks into lines, keeping their line endings.
+    A line longer than `max_length` is dropped as it streams in and yielded as None.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    overlong = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            if overlong or len(line) > max_length:
+                overlong = False
+                yield None
+            else:
+                yield line + "\n"
+        if len(buffer) > max_length:
+            overlong, buffer = True, ""
+    buffer += decoder.decode(b"", final=True)
+    if overlong or len(buffer) > max_length:
+        yield None
+    elif buffer:
+        yield buffer
+
+async def _csv_rows(chunks, max_length: int = BULK_IMPORT_MAX_RECORD_LENGTH):
+    """
+    Yields (line_number, dict_or_error) for each CSV record after the header row.
+    A record ends at a newline outside quotes, so quoted fields may span lines, up
+    to `max_length` characters; past that the record is reported and parsing
+    restarts on the next line. Empty cells are treated as missing values.
+    """
+    header = None
+    parts, length, quotes, start, line_number = [], 0, 0, 0, 0
+    async for line in _lines(chunks, max_length):
+        line_number += 1
+        if line is None:
+            yield (start if parts else line_number), f"Record longer than {max_length} characters"
+            parts, length, quotes = [], 0, 0
+            continue
+        if not parts:
+            start = line_number
+        parts.append(line)
+        length += len(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if length > max_length:
+                yield start, f"Record longer than {max_length} characters (unbalanced quote?)"
+                parts, length, quotes = [], 0, 0
+            continue # Inside a quoted field
+        text = "".join(parts)
+        parts, length, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield start, f"Malformed CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, f"Expected {len(header)} fields, got {len(values)}"
+            continue
+        yield start, {name: value for name, value in zip(header, values) if value != ""}
+    if parts and "".join(parts).strip():
+        yield start, "Unterminated quoted field"
+
+async def _ndjson_rows(chunks):
+    """Yields (line_number, dict_or_error) for each non-blank NDJSON line."""
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if line is None:
+            yield line_number, f"Line longer than {BULK_IMPORT_MAX_RECORD_LENGTH} characters"
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, data
+
+# --- Import ---
+
+def _describe(error: ValidationError):
+    return [f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()]
+
+async def import_internships(db, chunks, upload_format: str, employer_id: int) -> schemas.BulkImportReport:
+    """
+    Validates internships from a streamed CSV or NDJSON upload against
+    InternshipCreate as they arrive and inserts the valid ones in batches of
+    BULK_IMPORT_BATCH_SIZE, each committed on its own. Invalid rows are skipped
+    and listed in the report by line number.
+    """
+    parse = _csv_rows if upload_format == "csv" else _ndjson_rows
+    report = schemas.BulkImportReport()
+    batch = []
+
+    async for line_number, row in parse(chunks):
+        if isinstance(row, str):
+            problems = [row]
+        else:
+            try:
+                internship = schemas.InternshipCreate.model_validate(row)
+            except ValidationError as e:
+                problems = _describe(e)
+            else:
+                batch.append({**internship.model_dump(), "employer_id": employer_id})
+                if len(batch) >= BULK_IMPORT_BATCH_SIZE:
+                    report.imported += await crud_async.bulk_create_internships(db, rows=batch)
+                    batch = []
+                continue
+        report.failed += 1
+        if len(report.errors) < BULK_IMPORT_MAX_ERRORS:
+            report.errors.append(schemas.BulkImportError(line=line_number, errors=problems))
+        else:
+            report.errors_truncated = True
+
+    if batch:
+        report.imported += await crud_async.bulk_create_internships(db, rows=batch)
+    return report
@@ -1,14 +1,64 @@
 # backend/crud.py
 
+import io
 from datetime import datetime, timedelta
 
 from datetime import timezone
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import String, and_, cast, func, or_, case, insert, literal, literal_column, select, union_all, update, Text
+from sqlalchemy.dialects import postgresql, sqlite
 # Changed relative imports to absolute imports
-import models, schemas
+import models, schemas, search, recommendations
+from facet_cache import facet_cache
 from auth import get_password_hash # Import the hashing utility
+from pagination import paginate
+from user_cache import user_cache
+
+# Sort keys used for list endpoints; cursors encode these attributes of the last row
+USER_PAGE_KEY = ("id",)
+INTERNSHIP_PAGE_KEY = ("posted_date", "id")
+APPLICATION_PAGE_KEY = ("applied_date", "id")
+
+# Credits granted by the monthly refill for non-premium students
+FREE_MONTHLY_CREDITS = 5
+
+class InsufficientCredits(Exception):
+    """Raised when a credit debit would take a user's balance below zero."""
+
+class AlreadyApplied(Exception):
+    """Raised when a student applies to the same internship twice."""
+
+# --- Unit of work ---
+# Inside crud_async.transaction() the mutators below only flush; the caller
+# commits once for the whole request. Outside it each mutator commits itself.
+# Sessions keep objects loaded after commit and fetch server-side values with
+# RETURNING, so no mutator re-reads its rows.
+
+UNIT_OF_WORK = "unit_of_work"
+
+def in_unit_of_work(db: Session) -> bool:
+    return UNIT_OF_WORK in db.info
+
+def _commit(db: Session):
+    if in_unit_of_work(db):
+        db.flush()
+    else:
+        db.commit()
+
+def _rollback(db: Session):
+    """Rolls back a mutator's own transaction; inside a unit of work the caller does."""
+    if not in_unit_of_work(db):
+        db.rollback()
+
+def _forget_user(db: Session, user_id: int):
+    """Drops a changed user from the auth cache, after the unit of work commits if there is one."""
+    if in_unit_of_work(db):
+        db.info[UNIT_OF_WORK].add(user_id)
+    else:
+        user_cache.invalidate(user_id)
 
 # --- User CRUD Operations ---
 
@@ -20,16 +70,20 @@ def get_user_by_email(db: Session, email: str):
     """Retrieve a user by email."""
     return db.query(models.User).filter(models.User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100, role: str = None):
+def get_users(db: Session, skip: int = 0, limit: int = 100, role: str = None, cursor: str = None):
     """Retrieve a list of users, optionally filtered by role."""
     query = db.query(models.User)
     if role:
         query = query.filter(models.User.role == role)
-    return query.offset(skip).limit(limit).all()
-
-def create_user(db: Session, user: schemas.UserCreate, is_verified: bool = False):
-    """Create a new user with a hashed password and associated profile."""
-    hashed_password = get_password_hash(user.password)
+    return paginate(query, models.User, USER_PAGE_KEY, skip=skip, limit=limit, cursor=cursor, descending=False)
+
+def create_user(db: Session, user: schemas.UserCreate, is_verified: bool = False, hashed_password: str = None):
+    """
+    Create a new user with a hashed password and associated profile.
+    Pass `hashed_password` when the hash was already computed off-thread (auth.get_password_hash_async).
+    """
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -40,43 +94,39 @@ def create_user(db: Session, user: schemas.UserCreate, is_verified: bool = False
         address=user.address,
         bio=user.bio,
         profile_picture_url=user.profile_picture_url,
-        is_verified=is_verified        
+        is_verified=is_verified,
+        # Not yet updated. Set explicitly so eager_defaults has nothing to reload after the INSERT
+        updated_at=None,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
 
-    # Create associated profile based on role
+    # Create associated profile based on role; it is inserted in the same flush as the user
     if user.role == "student":
-        db_student_profile = models.StudentProfile(user_id=db_user.id)
-        db.add(db_student_profile)
+        db_user.student_profile = models.StudentProfile()
     elif user.role == "employer":
         # For employer, company_name is required in EmployerProfileCreate schema
         # but UserCreate doesn't have it directly. We'll need to handle this
         # in the route or assume it's set later. For now, create a basic one.
-        db_employer_profile = models.EmployerProfile(
-            user_id=db_user.id,
+        db_user.employer_profile = models.EmployerProfile(
             company_name=user.first_name + " " + user.last_name + "'s Company" if user.first_name and user.last_name else "New Company"
         )
-        db.add(db_employer_profile)
-    db.commit()
-    db.refresh(db_user) # Refresh again to load the relationship if needed
+    db.add(db_user)
+    _commit(db)
     return db_user
 
-def update_unverified_user(db: Session, user_data: schemas.UserCreate): # NEW FUNCTION
+def update_unverified_user(db: Session, user_data: schemas.UserCreate, hashed_password: str = None): # NEW FUNCTION
     """Updates user details for an unverified user."""
     db_user = get_user_by_email(db, email=user_data.email)
     if db_user:
-        db_user.hashed_password = get_password_hash(user_data.password)
+        db_user.hashed_password = hashed_password or get_password_hash(user_data.password)
         db_user.first_name = user_data.first_name
         db_user.last_name = user_data.last_name
         db_user.phone_number = user_data.phone_number
         db_user.address = user_data.address
-        db.commit()
-        db.refresh(db_user)
+        _commit(db)
+        _forget_user(db, db_user.id)
     return db_user
 
-def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
+def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate, hashed_password: str = None):
     """Update an existing user's details."""
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if not db_user:
@@ -84,14 +134,21 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
 
     update_data = user_update.model_dump(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        password = update_data.pop("password")
+        update_data["hashed_password"] = hashed_password or get_password_hash(password)
+    else:
+        update_data.pop("password", None)
+
+    # Tokens issued before a password or role change stop working
+    if "hashed_password" in update_data or ("role" in update_data and update_data["role"] != db_user.role):
+        update_data["token_version"] = (db_user.token_version or 0) + 1
 
     for key, value in update_data.items():
         setattr(db_user, key, value)
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    _commit(db)
+    _forget_user(db, user_id)
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -99,7 +156,8 @@ def delete_user(db: Session, user_id: int):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
         db.delete(db_user)
-        db.commit()
+        _commit(db)
+        _forget_user(db, user_id)
         return True
     return False
 
@@ -120,8 +178,7 @@ def update_student_profile(db: Session, user_id: int, profile_update: schemas.St
         setattr(db_profile, key, value)
 
     db.add(db_profile)
-    db.commit()
-    db.refresh(db_profile)
+    _commit(db)
     return db_profile
 
 # --- Employer Profile CRUD Operations ---
@@ -141,8 +198,7 @@ def update_employer_profile(db: Session, user_id: int, profile_update: schemas.E
         setattr(db_profile, key, value)
 
     db.add(db_profile)
-    db.commit()
-    db.refresh(db_profile)
+    _commit(db)
     return db_profile
 
 # --- Internship CRUD Operations ---
@@ -151,30 +207,132 @@ def get_internship(db: Session, internship_id: int):
     """Retrieve an internship by ID."""
     return db.query(models.Internship).filter(models.Internship.id == internship_id).first()
 
-def get_internships(db: Session, skip: int = 0, limit: int = 100, employer_id: int = None, search_query: str = None):
-    """Retrieve a list of internships, optionally filtered by employer or search query."""
+def get_internships(db: Session, skip: int = 0, limit: int = 100, employer_id: int = None, search_query: str = None, cursor: str = None, active_only: bool = False):
+    """
+    Retrieve a list of internships, newest first, optionally filtered by employer or search query.
+    Search results are ordered by relevance and only support `skip` pagination.
+    """
+    if search_query and search.is_supported(db):
+        # Ranked, index-backed full-text search (see search.py)
+        return search.search_internships(db, search_query, skip=skip, limit=limit, employer_id=employer_id, active_only=active_only)
+    return get_internships_ilike(db, skip=skip, limit=limit, employer_id=employer_id, search_query=search_query, cursor=cursor, active_only=active_only)
+
+def get_internships_ilike(db: Session, skip: int = 0, limit: int = 100, employer_id: int = None, search_query: str = None, cursor: str = None, active_only: bool = False):
+    """Unindexed substring search, used on databases without full-text support."""
     query = db.query(models.Internship)
+    if active_only:
+        # Matches the predicate of the partial index ix_internships_active_posted_date
+        query = query.filter(models.Internship.is_active == True)
     if employer_id:
         query = query.filter(models.Internship.employer_id == employer_id)
     if search_query:
-        # Simple search across title, description, location
-        query = query.filter(
-            or_(
-                models.Internship.title.ilike(f"%{search_query}%"),
-                models.Internship.description.ilike(f"%{search_query}%"),
-                models.Internship.location.ilike(f"%{search_query}%")
-            )
-        )
-    return query.offset(skip).limit(limit).all()
+        query = query.filter(_ilike_filter(search_query))
+    return paginate(query, models.Internship, INTERNSHIP_PAGE_KEY, skip=skip, limit=limit, cursor=cursor)
+
+def _ilike_filter(search_query: str):
+    # Simple search across title, description, location
+    return or_(
+        models.Internship.title.ilike(f"%{search_query}%"),
+        models.Internship.description.ilike(f"%{search_query}%"),
+        models.Internship.location.ilike(f"%{search_query}%")
+    )
+
+# Columns counted by get_internship_facets, plus the derived "status" facet
+FACET_COLUMNS = ("location", "stipend", "duration")
+FACET_MAX_VALUES = 50
+
+def get_internship_facets(db: Session, search_query: str = None):
+    """
+    Internship counts by location, stipend, duration and status ('active', or
+    'expired' once inactive or past the deadline), over everything `search_query`
+    matches with the same matching as get_internships. One UNION ALL of grouped
+    queries; the unfiltered counts are cached until the next internship write.
+    """
+    if not search_query:
+        counts, generation = facet_cache.get()
+        if counts is not None:
+            return counts
+
+    status_value = case(
+        (
+            and_(
+                models.Internship.is_active == True,
+                or_(models.Internship.deadline_date.is_(None), models.Internship.deadline_date >= datetime.now(timezone.utc)),
+            ),
+            "active",
+        ),
+        else_="expired",
+    )
+    where = []
+    if search_query:
+        where.append(search.match_filter(db, search_query) if search.is_supported(db) else _ilike_filter(search_query))
+
+    grouped = [
+        select(literal(name).label("facet"), cast(value, String).label("value"), func.count().label("count"))
+        .where(*where)
+        # By output label: the status CASE carries a bind parameter, and PostgreSQL
+        # does not treat two copies of it as the same grouped expression
+        .group_by(literal_column("value"))
+        for name, value in [(name, getattr(models.Internship, name)) for name in FACET_COLUMNS] + [("status", status_value)]
+    ]
+    facets = {name: [] for name in FACET_COLUMNS + ("status",)}
+    for row in db.execute(union_all(*grouped)):
+        facets[row.facet].append({"value": row.value, "count": row.count})
+    for name, values in facets.items():
+        values.sort(key=lambda entry: (-entry["count"], entry["value"] or ""))
+        del values[FACET_MAX_VALUES:]
+    counts = {"total": sum(entry["count"] for entry in facets["status"]), **facets}
+
+    if not search_query:
+        facet_cache.put(counts, generation)
+    return counts
 
 def create_internship(db: Session, internship: schemas.InternshipCreate, employer_id: int):
     """Create a new internship for a given employer."""
     db_internship = models.Internship(**internship.model_dump(), employer_id=employer_id)
     db.add(db_internship)
-    db.commit()
-    db.refresh(db_internship)
+    _commit(db)
+    recommendations.index.upsert(db_internship)
+    facet_cache.invalidate()
     return db_internship
 
+# Internship columns written by a bulk import, in COPY order
+BULK_INTERNSHIP_COLUMNS = ["employer_id"] + list(schemas.InternshipCreate.model_fields)
+
+def _copy_value(value) -> str:
+    """Encodes a value for PostgreSQL's COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def bulk_create_internships(db: Session, rows: list):
+    """
+    Inserts many internships (dicts of BULK_INTERNSHIP_COLUMNS) without loading them.
+    Uses COPY on psycopg2 and a single executemany INSERT elsewhere. Returns the row count.
+    """
+    if not rows:
+        return 0
+    if db.bind.dialect.driver == "psycopg2":
+        lines = "".join(
+            "\t".join(_copy_value(row.get(column)) for column in BULK_INTERNSHIP_COLUMNS) + "\n" for row in rows
+        )
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY internships ({', '.join(BULK_INTERNSHIP_COLUMNS)}) FROM STDIN", io.StringIO(lines)
+            )
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(models.Internship), rows)
+    _commit(db)
+    facet_cache.invalidate()
+    return len(rows)
+
 def update_internship(db: Session, internship_id: int, internship_update: schemas.InternshipUpdate):
     """Update an existing internship."""
     db_internship = db.query(models.Internship).filter(models.Internship.id == internship_id).first()
@@ -185,9 +343,13 @@ def update_internship(db: Session, internship_id: int, internship_update: schema
     for key, value in update_data.items():
         setattr(db_internship, key, value)
 
+    # A new version invalidates the ETags clients and caches hold for this internship
+    if db.is_modified(db_internship):
+        db_internship.version = (db_internship.version or 0) + 1
     db.add(db_internship)
-    db.commit()
-    db.refresh(db_internship)
+    _commit(db)
+    recommendations.index.upsert(db_internship)
+    facet_cache.invalidate()
     return db_internship
 
 def delete_internship(db: Session, internship_id: int):
@@ -195,54 +357,195 @@ def delete_internship(db: Session, internship_id: int):
     db_internship = db.query(models.Internship).filter(models.Internship.id == internship_id).first()
     if db_internship:
         db.delete(db_internship)
-        db.commit()
+        _commit(db)
+        recommendations.index.remove(internship_id)
+        facet_cache.invalidate()
         return True
     return False
 
+def recommend_internships(db: Session, student_id: int, limit: int = 20):
+    """
+    Active internships ranked by TF-IDF similarity to the student's skills and
+    experience (see recommendations.py), skipping ones already applied to.
+    Returns None without a student profile. Results carry a transient `match_score`.
+    """
+    profile = get_student_profile(db, user_id=student_id)
+    if profile is None:
+        return None
+    # Skills count twice: they are what the student says they can do
+    text = " ".join([recommendations.profile_text(profile.skills)] * 2 + [recommendations.profile_text(profile.experience)])
+    recommendations.index.refresh(db)
+    applied = set(db.scalars(select(models.Application.internship_id).where(models.Application.student_id == student_id)))
+    # Over-fetch a little: postings deleted by another worker are only noticed here
+    ranked = recommendations.index.top_k(text, limit + 10, exclude=applied)
+    if not ranked:
+        return []
+
+    internships = {
+        internship.id: internship
+        for internship in db.query(models.Internship).filter(
+            models.Internship.id.in_([internship_id for internship_id, _ in ranked]),
+            models.Internship.is_active == True,
+        )
+    }
+    results = []
+    for internship_id, score in ranked:
+        internship = internships.get(internship_id)
+        if internship is None:
+            recommendations.index.remove(internship_id)
+            continue
+        internship.match_score = round(score, 4)
+        results.append(internship)
+    return results[:limit]
+
 # --- Application CRUD Operations ---
 
 def get_application(db: Session, application_id: int):
     """Retrieve an application by ID."""
     return db.query(models.Application).filter(models.Application.id == application_id).first()
 
-def get_applications_by_internship(db: Session, internship_id: int, skip: int = 0, limit: int = 100):
-    """Retrieve applications for a specific internship."""
-    return db.query(models.Application).filter(models.Application.internship_id == internship_id).offset(skip).limit(limit).all()
-
-def get_applications_by_student(db: Session, student_id: int, skip: int = 0, limit: int = 100):
-    """Retrieve applications made by a specific student."""
-    return db.query(models.Application).filter(models.Application.student_id == student_id).offset(skip).limit(limit).all()
-
-def create_application(db: Session, application: schemas.ApplicationCreate, student_id: int):
-    """Create a new application for an internship by a student."""
-    # Check if student has already applied to this internship
-    existing_application = db.query(models.Application).filter(
-        models.Application.internship_id == application.internship_id,
-        models.Application.student_id == student_id
-    ).first()
-    if existing_application:
-        return None # Indicate that application already exists
-
-    db_application = models.Application(
-        internship_id=application.internship_id,
-        student_id=student_id,
-        cover_letter=application.cover_letter,
-        status=application.status
+def get_applications_by_internship(db: Session, internship_id: int, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Retrieve applications for a specific internship, newest first."""
+    query = db.query(models.Application).filter(models.Application.internship_id == internship_id)
+    return paginate(query, models.Application, APPLICATION_PAGE_KEY, skip=skip, limit=limit, cursor=cursor)
+
+def get_applications_by_student(db: Session, student_id: int, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Retrieve applications made by a specific student, newest first."""
+    query = db.query(models.Application).filter(models.Application.student_id == student_id)
+    return paginate(query, models.Application, APPLICATION_PAGE_KEY, skip=skip, limit=limit, cursor=cursor)
+
+def get_hired_applications(db: Session, employer_id: int, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Retrieve hired applications across all of an employer's internships, newest first, in one query."""
+    query = (
+        db.query(models.Application)
+        .join(models.Internship, models.Application.internship_id == models.Internship.id)
+        .filter(models.Internship.employer_id == employer_id, models.Application.status == "hired")
     )
-    db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    return paginate(query, models.Application, APPLICATION_PAGE_KEY, skip=skip, limit=limit, cursor=cursor)
+
+def get_employer_dashboard(db: Session, employer_id: int):
+    """
+    Every internship the employer owns, newest first, with its application counts
+    by status, total, hired count and latest application time. One GROUP BY over
+    internships LEFT JOIN applications, served by ix_internships_employer_id_posted_date
+    and ix_applications_internship_id_status_applied_date.
+    """
+    internship = models.Internship
+    application = models.Application
+    rows = db.execute(
+        select(
+            internship.id, internship.title, internship.is_active, internship.posted_date,
+            application.status, func.count(application.id).label("count"),
+            func.max(application.applied_date).label("latest"),
+        )
+        .outerjoin(application, application.internship_id == internship.id)
+        .where(internship.employer_id == employer_id)
+        .group_by(internship.id, internship.title, internship.is_active, internship.posted_date, application.status)
+        .order_by(internship.posted_date.desc(), internship.id.desc())
+    )
+    entries = {}
+    for row in rows:
+        entry = entries.get(row.id)
+        if entry is None:
+            entry = entries[row.id] = {
+                "internship_id": row.id,
+                "title": row.title,
+                "is_active": row.is_active,
+                "posted_date": row.posted_date,
+                "application_counts": {},
+                "total_applications": 0,
+                "hired": 0,
+                "latest_application_at": None,
+            }
+        if not row.count:
+            continue # No applications: the LEFT JOIN's NULL row
+        status = row.status or "pending" # The column default; older rows may be NULL
+        entry["application_counts"][status] = entry["application_counts"].get(status, 0) + row.count
+        entry["total_applications"] += row.count
+        if status == "hired":
+            entry["hired"] = row.count
+        if row.latest is not None and (entry["latest_application_at"] is None or row.latest > entry["latest_application_at"]):
+            entry["latest_application_at"] = row.latest
+    return list(entries.values())
+
+def _insert(db: Session, model):
+    """INSERT construct for the session's dialect, so ON CONFLICT is available where supported."""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    return insert(model)
+
+def create_application(db: Session, application: schemas.ApplicationCreate, student_id: int, charge_credit: bool = False):
+    """
+    Create a new application for an internship by a student, in one transaction.
+    With `charge_credit`, one credit is debited by a conditional UPDATE and
+    recorded in the credit ledger; a failed insert rolls the debit back.
+    Returns None if the internship does not exist. Raises AlreadyApplied or
+    InsufficientCredits. The returned row carries the application's columns.
+    """
+    try:
+        balance = None
+        if charge_credit:
+            balance = _change_credits(db, student_id, -1)
+            if balance is None:
+                raise InsufficientCredits()
+
+        # INSERT ... SELECT only inserts if the internship exists, and the unique
+        # (internship_id, student_id) constraint turns a duplicate into no row
+        table = models.Application.__table__
+        stmt = _insert(db, models.Application).from_select(
+            ["internship_id", "student_id", "cover_letter", "status"],
+            select(
+                models.Internship.id,
+                literal(student_id),
+                literal(application.cover_letter, Text),
+                literal(application.status),
+            ).where(models.Internship.id == application.internship_id),
+        )
+        if db.bind.dialect.name in ("postgresql", "sqlite"):
+            stmt = stmt.on_conflict_do_nothing(index_elements=["internship_id", "student_id"])
+        db_application = db.execute(stmt.returning(*table.c)).first()
+        if db_application is None:
+            raise AlreadyApplied()
+
+        if charge_credit:
+            _record_credit_change(db, student_id, -1, balance, "apply", application_id=db_application.id)
+        _commit(db)
+    except (InsufficientCredits, AlreadyApplied):
+        _rollback(db)
+        if get_internship(db, application.internship_id) is None:
+            return None
+        raise
+    except Exception:
+        _rollback(db)
+        raise
+    if charge_credit:
+        _forget_user(db, student_id)
     return db_application
 
 def update_application_status(db: Session, application_id: int, new_status: str):
-    """Update the status of an application."""
-    db_application = db.query(models.Application).filter(models.Application.id == application_id).first()
+    """
+    Update the status of an application.
+    Moving it to 'hired' charges the student one credit in the same transaction
+    (premium students are not charged); raises InsufficientCredits if they have none.
+    """
+    db_application = db.get(models.Application, application_id)
     if not db_application:
         return None
-    db_application.status = new_status
-    db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    charged = False
+    try:
+        if new_status.lower() == "hired" and (db_application.status or "").lower() != "hired":
+            charged = _charge_hire(db, db_application)
+        db_application.status = new_status
+        db.add(db_application)
+        _commit(db)
+    except Exception:
+        _rollback(db)
+        raise
+    if charged:
+        _forget_user(db, db_application.student_id)
     return db_application
 
 def delete_application(db: Session, application_id: int):
@@ -250,27 +553,33 @@ def delete_application(db: Session, application_id: int):
     db_application = db.query(models.Application).filter(models.Application.id == application_id).first()
     if db_application:
         db.delete(db_application)
-        db.commit()
+        _commit(db)
         return True
     return False
 
-def set_user_otp(db: Session, user: models.User, otp: str):
-    """Sets the OTP and expiration for a user."""
+def set_user_otp(db: Session, user: models.User, otp: str, email: dict = None):
+    """
+    Sets the OTP and expiration for a user.
+    `email` (subject/body, see mail.py) is queued in the outbox in the same transaction.
+    """
     user.otp = otp
     user.otp_expires_at = datetime.now(timezone.utc) + timedelta(minutes=10) # OTP valid for 10 minutes
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    if email:
+        enqueue_email(db, recipient=user.email, commit=False, **email)
+    _commit(db)
+    _forget_user(db, user.id)
     return user
 
-def reset_user_password(db: Session, user: models.User, new_password: str):
+def reset_user_password(db: Session, user: models.User, new_password: str, hashed_password: str = None):
     """Resets the user's password."""
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = hashed_password or get_password_hash(new_password)
+    user.token_version = (user.token_version or 0) + 1 # Sign out existing sessions
     user.otp = None
     user.otp_expires_at = None
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    _commit(db)
+    _forget_user(db, user.id)
     return user
 
 def verify_user(db: Session, user: models.User):
@@ -279,7 +588,193 @@ def verify_user(db: Session, user: models.User):
     user.otp = None
     user.otp_expires_at = None
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    _commit(db)
+    _forget_user(db, user.id)
     return user
 
+# --- Email Outbox Operations ---
+
+def enqueue_email(db: Session, recipient: str, subject: str, body: str, subtype: str = "html", commit: bool = True):
+    """Queue an email for the outbox dispatcher."""
+    db_email = models.EmailOutbox(recipient=recipient, subject=subject, body=body, subtype=subtype)
+    db.add(db_email)
+    if commit:
+        _commit(db)
+    return db_email
+
+def claim_outbox_batch(db: Session, batch_size: int, lease_seconds: float):
+    """
+    Claim up to `batch_size` due emails for delivery.
+    Claimed rows are leased: if the claiming worker dies, they become due again
+    once the lease expires. Concurrent workers skip each other's locked rows.
+    """
+    now = datetime.now(timezone.utc)
+    emails = (
+        db.query(models.EmailOutbox)
+        .filter(
+            models.EmailOutbox.status.in_(["pending", "sending"]),
+            models.EmailOutbox.next_attempt_at <= now,
+        )
+        .order_by(models.EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for email in emails:
+        email.status = "sending"
+        email.next_attempt_at = now + timedelta(seconds=lease_seconds)
+    db.commit()
+    return emails
+
+def mark_email_sent(db: Session, email_id: int):
+    """Record a successful delivery. The body is blanked: it may hold an OTP or reset code."""
+    db.query(models.EmailOutbox).filter(models.EmailOutbox.id == email_id).update(
+        {"status": "sent", "sent_at": datetime.now(timezone.utc), "last_error": None, "body": ""},
+        synchronize_session=False,
+    )
+    db.commit()
+
+def mark_email_failed(db: Session, email_id: int, error: str, retry_at: datetime = None):
+    """Record a failed delivery; retried at `retry_at`, or given up on (and the body blanked) if it is None."""
+    values = {"attempts": models.EmailOutbox.attempts + 1, "last_error": error}
+    if retry_at is None:
+        values.update({"status": "failed", "body": ""})
+    else:
+        values.update({"status": "pending", "next_attempt_at": retry_at})
+    db.query(models.EmailOutbox).filter(models.EmailOutbox.id == email_id).update(values, synchronize_session=False)
+    db.commit()
+
+def prune_outbox(db: Session, finished_before: datetime) -> int:
+    """Delete sent and given-up emails created before `finished_before`. Returns the row count."""
+    deleted = db.query(models.EmailOutbox).filter(
+        models.EmailOutbox.status.in_(["sent", "failed"]),
+        models.EmailOutbox.created_at < finished_before,
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+# --- Credit Operations ---
+
+def _change_credits(db: Session, user_id: int, delta: int):
+    """
+    Atomically adds `delta` to a user's credits, refusing to go below zero.
+    Returns the new balance, or None if the user lacks the credits. Does not commit.
+    """
+    stmt = update(models.User).where(models.User.id == user_id)
+    if delta < 0:
+        stmt = stmt.where(models.User.credits >= -delta)
+    stmt = stmt.values(credits=models.User.credits + delta).returning(models.User.credits)
+    balance = db.execute(stmt, execution_options={"synchronize_session": False}).scalar_one_or_none()
+    if balance is not None:
+        _sync_loaded_user(db, user_id, credits=balance)
+    return balance
+
+def _sync_loaded_user(db: Session, user_id: int, **values):
+    """Copies values written by a Core UPDATE onto the session's loaded User, if any."""
+    user = db.identity_map.get(identity_key(models.User, user_id))
+    if user is not None:
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+
+def _record_credit_change(db: Session, user_id: int, delta: int, balance: int, reason: str, application_id: int = None):
+    db.add(models.CreditLedger(
+        user_id=user_id, delta=delta, balance_after=balance, reason=reason, application_id=application_id
+    ))
+
+def _charge_hire(db: Session, db_application: models.Application) -> bool:
+    """Debits the hired student's credit unless they are premium. Returns whether a credit was taken."""
+    User = models.User
+    row = db.execute(
+        update(User)
+        .where(User.id == db_application.student_id, or_(User.is_premium == True, User.credits >= 1))
+        .values(credits=case((User.is_premium == True, User.credits), else_=User.credits - 1))
+        .returning(User.credits, User.is_premium),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        raise InsufficientCredits()
+    _sync_loaded_user(db, db_application.student_id, credits=row.credits)
+    if row.is_premium:
+        return False
+    _record_credit_change(db, db_application.student_id, -1, row.credits, "hired", application_id=db_application.id)
+    return True
+
+def top_up_credits(db: Session, user_id: int, amount: int):
+    """Adds credits to a user and records the top-up in the ledger. Returns the new balance."""
+    try:
+        balance = _change_credits(db, user_id, amount)
+        if balance is None:
+            return None
+        _record_credit_change(db, user_id, amount, balance, "top_up")
+        _commit(db)
+    except Exception:
+        _rollback(db)
+        raise
+    _forget_user(db, user_id)
+    return balance
+
+def refill_free_credits(db: Session, user: models.User, period: timedelta = timedelta(days=30)):
+    """
+    Resets a non-premium student's credits to the monthly allowance once `period`
+    has passed since the last refill. The row is locked so concurrent requests
+    refill at most once. Returns True if a refill happened.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        locked = db.execute(
+            select(models.User.credits)
+            .where(models.User.id == user.id, models.User.last_credit_refill < now - period)
+            .with_for_update()
+        ).first()
+        if locked is None:
+            _rollback(db)
+            return False
+        db.execute(
+            update(models.User)
+            .where(models.User.id == user.id)
+            .values(credits=FREE_MONTHLY_CREDITS, last_credit_refill=now),
+            execution_options={"synchronize_session": False},
+        )
+        _sync_loaded_user(db, user.id, credits=FREE_MONTHLY_CREDITS, last_credit_refill=now)
+        _record_credit_change(db, user.id, FREE_MONTHLY_CREDITS - locked.credits, FREE_MONTHLY_CREDITS, "refill")
+        _commit(db)
+    except Exception:
+        _rollback(db)
+        raise
+    _forget_user(db, user.id)
+    return True
+
+# --- Rate Limit Operations ---
+
+def take_rate_limit_token(db: Session, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+    """
+    Takes one token from the shared bucket `key`, creating it full if needed.
+    The row is locked for the read-modify-write. Returns 0 when a token was taken,
+    otherwise the seconds until one will be available.
+    """
+    Bucket = models.RateLimitBucket
+    try:
+        stmt = _insert(db, Bucket).values(key=key, tokens=capacity, updated_at=now)
+        if db.bind.dialect.name in ("postgresql", "sqlite"):
+            stmt = stmt.on_conflict_do_nothing(index_elements=["key"])
+        db.execute(stmt)
+        bucket = db.execute(select(Bucket).where(Bucket.key == key).with_for_update()).scalar_one()
+        tokens = min(capacity, bucket.tokens + max(now - bucket.updated_at, 0.0) * refill_per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+        bucket.tokens = tokens
+        bucket.updated_at = now
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return retry_after
+
+def prune_rate_limit_buckets(db: Session, idle_before: float) -> int:
+    """Deletes buckets untouched since `idle_before` (Unix time); they would be full again anyway."""
+    deleted = db.query(models.RateLimitBucket).filter(models.RateLimitBucket.updated_at < idle_before).delete(synchronize_session=False)
+    db.commit()
+    return deleted
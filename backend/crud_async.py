@@ -0,0 +1,54 @@
+# backend/crud_async.py
+
+import functools
+import inspect
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import crud
+from database import run_db
+from user_cache import user_cache
+
+# Awaitable variants of every public function in crud, generated rather than
+# duplicated so the query logic lives in one place. Each takes the same
+# arguments as its crud counterpart and accepts either a Session or an
+# AsyncSession, e.g. `await crud_async.get_user(db, user_id=1)`.
+
+def _make_async(fn):
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        return await run_db(db, fn, *args, **kwargs)
+    return wrapper
+
+for _name, _fn in inspect.getmembers(crud, inspect.isfunction):
+    if _fn.__module__ == crud.__name__ and not _name.startswith("_"):
+        globals()[_name] = _make_async(_fn)
+
+@asynccontextmanager
+async def transaction(db):
+    """
+    Unit of work for a request: crud mutators called inside only flush, and the
+    block commits once when it exits (or rolls back if it raises, including on
+    HTTPException). Cached users changed inside are dropped after the commit.
+
+        async with crud_async.transaction(db):
+            user = await crud_async.create_user(db, user=data)
+            await crud_async.set_user_otp(db, user=user, otp=otp)
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    if crud.in_unit_of_work(session):
+        yield db # Nested: the outer block commits
+        return
+    session.info[crud.UNIT_OF_WORK] = changed_users = set()
+    try:
+        yield db
+        await run_db(db, Session.commit)
+    except BaseException:
+        await run_db(db, Session.rollback)
+        raise
+    finally:
+        session.info.pop(crud.UNIT_OF_WORK, None)
+    for user_id in changed_users:
+        user_cache.invalidate(user_id)
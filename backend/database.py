@@ -1,8 +1,14 @@
 # backend/database.py
 
-from sqlalchemy import create_engine
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 import os
 from dotenv import load_dotenv
 
@@ -12,11 +18,64 @@ load_dotenv()
 # Get database URL from environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# "sync" runs queries through psycopg2 on the threadpool, "async" through asyncpg/aiosqlite
+# on the event loop. Both serve the same routes so their throughput can be compared.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Connection pool settings. Pre-ping and recycling replace connections a failover
+# or an idle timeout has killed before a request gets them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() in ("true", "1", "t")
+# Server-side limit per statement in milliseconds (PostgreSQL only); 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+# How long /readyz waits for SELECT 1
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", 2))
+
+def engine_options(url: str) -> dict:
+    """create_engine / create_async_engine keyword arguments for `url`, from the settings above."""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    # In-memory SQLite uses a single shared connection, not a sized pool
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    if DB_STATEMENT_TIMEOUT_MS and parsed.get_backend_name() == "postgresql":
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def async_database_url(url: str) -> str:
+    """Derives the async-driver URL for a sync database URL."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
 # Create a SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
-# Create a SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create a SessionLocal class. Objects stay loaded after commit so mutators need
+# no reload SELECT; server-generated values come back through RETURNING instead.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The async engine is only built in async mode so the sync deployment does not need asyncpg
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    # Same session settings as SessionLocal
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for declarative models
 Base = declarative_base()
@@ -32,3 +91,57 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Provides an AsyncSession for a request (async mode only).
+    Ensures the session is closed after the request is processed.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# The session dependency used by routes, selected by DB_MODE
+get_session = get_async_db if DB_MODE == "async" else get_db
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Awaits a function written against a sync Session, `fn(session, *args, **kwargs)`.
+    An AsyncSession runs it on its own connection via run_sync; a sync Session
+    runs it on the threadpool. Either way the event loop is not blocked.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+# --- Health ---
+
+def pool_status() -> dict:
+    """Checked-out connections against the pool's capacity, for the engine requests use."""
+    pool = (async_engine.sync_engine if async_engine is not None else engine).pool
+    if not hasattr(pool, "checkedout"):
+        return {"checked_out": None, "capacity": None, "saturated": False}
+    checked_out = pool.checkedout()
+    if DB_MAX_OVERFLOW < 0: # Unbounded overflow never saturates
+        return {"checked_out": checked_out, "capacity": None, "saturated": False}
+    capacity = pool.size() + DB_MAX_OVERFLOW
+    return {"checked_out": checked_out, "capacity": capacity, "saturated": checked_out >= capacity}
+
+def _ping_sync():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+async def _ping_async():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def ping(timeout: float = READINESS_TIMEOUT_SECONDS) -> float:
+    """
+    Runs SELECT 1 on a pooled connection and returns how long it took in seconds.
+    Raises asyncio.TimeoutError past `timeout`, or the driver's error if the database is down.
+    """
+    started = time.perf_counter()
+    if async_engine is not None:
+        await asyncio.wait_for(_ping_async(), timeout)
+    else:
+        await asyncio.wait_for(run_in_threadpool(_ping_sync), timeout)
+    return time.perf_counter() - started
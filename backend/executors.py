@@ -0,0 +1,105 @@
+# backend/executors.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+
+def _timed(fn, *args):
+    """Runs `fn` in a pool worker and reports how long the work itself took."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+class PoolSaturated(Exception):
+    """Raised when a bounded executor already has its maximum of queued work."""
+
+    def __init__(self, pool_name: str):
+        super().__init__(f"The {pool_name} pool is saturated")
+        self.pool_name = pool_name
+
+class BoundedExecutor:
+    """
+    Thread or process pool for CPU-heavy work, kept off the request threadpool.
+    At most `workers` calls run at once and at most `queue_depth` more wait;
+    anything beyond that is rejected immediately instead of piling up.
+    `initializer` runs once in each worker, e.g. to compile templates.
+    """
+
+    def __init__(self, name: str, workers: int, queue_depth: int, kind: str = "thread", initializer=None):
+        self.name = name
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.kind = kind
+        self.initializer = initializer
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.work_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_work_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix=self.name, initializer=self.initializer
+                        )
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Runs `fn(*args)` on the pool, raising PoolSaturated if it is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            metrics.EXECUTOR_REJECTED.labels(self.name).inc()
+            raise PoolSaturated(self.name)
+        submitted = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        metrics.EXECUTOR_IN_FLIGHT.labels(self.name).inc()
+        try:
+            loop = asyncio.get_running_loop()
+            result, work = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            metrics.EXECUTOR_IN_FLIGHT.labels(self.name).dec()
+            self._slots.release()
+        wait = max(time.perf_counter() - submitted - work, 0.0)
+        with self._lock:
+            self.completed += 1
+            self.work_seconds += work
+            self.wait_seconds += wait
+            self.max_work_seconds = max(self.max_work_seconds, work)
+        metrics.EXECUTOR_WORK_SECONDS.labels(self.name, getattr(fn, "__name__", "task")).observe(work)
+        metrics.EXECUTOR_WAIT_SECONDS.labels(self.name).observe(wait)
+        return result
+
+    def stats(self) -> dict:
+        """Snapshot of the pool's counters and timings."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "work_seconds_total": self.work_seconds,
+                "wait_seconds_total": self.wait_seconds,
+                "max_work_seconds": self.max_work_seconds,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,87 @@
+# backend/exports.py
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import select
+
+import models, schemas
+from database import DB_MODE, engine, async_engine
+
+# Rows fetched per server-side cursor round trip, and written per response chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Exported columns follow the API response schemas, so nothing an endpoint
+# would hide (password hashes, OTPs) leaves through an export either
+EXPORTS = {
+    "users": (models.User, schemas.UserResponse),
+    "internships": (models.Internship, schemas.InternshipResponse),
+    "applications": (models.Application, schemas.ApplicationResponse),
+}
+
+def export_columns(name: str):
+    model, schema = EXPORTS[name]
+    table = model.__table__
+    return [table.c[field] for field in schema.model_fields if field in table.c]
+
+# --- Encoding ---
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _ndjson(keys, rows) -> str:
+    return "".join(json.dumps(dict(zip(keys, row)), default=_json_default) + "\n" for row in rows)
+
+def _csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+# --- Streaming ---
+
+def _statement(columns):
+    return select(*columns).order_by(columns[0].table.c.id)
+
+def _sync_chunks(columns, encode, header: str):
+    # Iterated on the threadpool one chunk at a time; the connection is held only while streaming
+    if header:
+        yield header
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(_statement(columns))
+        for rows in result.partitions():
+            yield encode(rows)
+
+async def _async_chunks(columns, encode, header: str):
+    if header:
+        yield header
+    async with async_engine.connect() as conn:
+        result = await conn.stream(_statement(columns).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield encode(rows)
+
+def stream_export(name: str, export_format: str):
+    """
+    Iterator of text chunks exporting the `name` table, for a StreamingResponse.
+    Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a time and never
+    loaded as ORM objects, so memory use does not grow with the table.
+    """
+    columns = export_columns(name)
+    keys = [column.key for column in columns]
+    if export_format == "csv":
+        encode, header = _csv, _csv([keys])
+    else:
+        encode, header = (lambda rows: _ndjson(keys, rows)), None
+    chunks = _async_chunks if DB_MODE == "async" else _sync_chunks
+    return chunks(columns, encode, header)
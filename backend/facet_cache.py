@@ -0,0 +1,40 @@
+# backend/facet_cache.py
+
+import os
+import threading
+import time
+
+# Entries are per process: writes on this worker invalidate immediately, writes on
+# other workers (and internships passing their deadline) show up after the TTL.
+FACET_CACHE_TTL_SECONDS = float(os.getenv("FACET_CACHE_TTL_SECONDS", 60))
+
+class FacetCache:
+    """
+    Holds facet counts for the unfiltered internship listing. A generation number
+    guards against a slow reader storing counts computed before an invalidation.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entry = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(counts or None, generation); pass the generation back to put()."""
+        with self._lock:
+            if self._entry is not None and self._entry[0] > time.monotonic():
+                return self._entry[1], self._generation
+            return None, self._generation
+
+    def put(self, counts: dict, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self._entry = (time.monotonic() + self.ttl_seconds, counts)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+facet_cache = FacetCache(FACET_CACHE_TTL_SECONDS)
@@ -0,0 +1,78 @@
+# backend/http_cache.py
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Cache-Control for public internship reads. A shared cache (reverse proxy, CDN)
+# may serve a response for max-age seconds and, while it revalidates in the
+# background, keep serving it stale for stale-while-revalidate more.
+INTERNSHIP_CACHE_MAX_AGE = int(os.getenv("INTERNSHIP_CACHE_MAX_AGE", 30))
+INTERNSHIP_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("INTERNSHIP_CACHE_STALE_WHILE_REVALIDATE", 60))
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def internship_etag(internship) -> str:
+    """Strong ETag for one internship, from its id and version."""
+    return f'"{internship.id}-{internship.version or 1}"'
+
+def internship_last_modified(internship) -> datetime:
+    return internship.updated_at or internship.posted_date
+
+def listing_etag(internships, params, weak: bool = False) -> str:
+    """
+    ETag for a page of internships: a digest of the request parameters and the
+    id and version of every item, so any added, removed or edited item changes it.
+    """
+    digest = hashlib.sha256(repr(params).encode())
+    for internship in internships:
+        digest.update(f"{internship.id}-{internship.version or 1};".encode())
+    tag = f'"{digest.hexdigest()[:32]}"'
+    return f"W/{tag}" if weak else tag
+
+def cache_headers(etag: str, last_modified: datetime = None) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={INTERNSHIP_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={INTERNSHIP_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime = None) -> bool:
+    """
+    Evaluates If-None-Match (weak comparison) or, only when that is absent,
+    If-Modified-Since, as RFC 9110 orders them for GET.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return _utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+def not_modified(headers) -> Response:
+    """A 304 response carrying the validators and caching headers, with no body."""
+    return Response(status_code=304, headers=headers)
@@ -1,9 +1,19 @@
 # backend/mail.py
 
+import asyncio
 import os
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
+import crud, metrics
+from database import SessionLocal
+
 load_dotenv()
 
 conf = ConnectionConfig(
@@ -18,26 +28,187 @@ conf = ConnectionConfig(
     VALIDATE_CERTS=True
 )
 
-fm = FastMail(conf)
-
-async def send_otp_email(email: str, otp: str):
-    message = MessageSchema(
-        subject="Your Password Reset OTP",
-        recipients=[email],
-        body=f"Your OTP for password reset is: {otp}",
-        subtype="html"
-    )
-    await fm.send_message(message)
-
-async def send_registration_email(email: str, otp: str):
-    message = MessageSchema(
-        subject="Welcome to I-Intern! Verify Your Email",
-        recipients=[email],
-        body=f"""
+# Outbox dispatcher settings. For local testing point MAIL_SERVER/MAIL_PORT at an
+# aiosmtpd stand-in (`python -m aiosmtpd -n -l localhost:1025`) with
+# MAIL_STARTTLS=False and no MAIL_USERNAME.
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 5))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", 120))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", 10))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", 3600))
+# Sent and given-up rows (their bodies already blanked) are deleted after this long
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", 24 * 7))
+OUTBOX_PRUNE_INTERVAL_SECONDS = 3600
+# How long an idle SMTP connection is kept open between batches
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", 60))
+
+# --- Message content ---
+
+def otp_email(otp: str) -> dict:
+    return {
+        "subject": "Your Password Reset OTP",
+        "body": f"Your OTP for password reset is: {otp}",
+    }
+
+def registration_email(otp: str) -> dict:
+    return {
+        "subject": "Welcome to I-Intern! Verify Your Email",
+        "body": f"""
         <p>Thank you for registering with I-Intern!</p>
         <p>Your One-Time Password (OTP) to verify your account is: <strong>{otp}</strong></p>
         <p>This OTP is valid for 10 minutes.</p>
         """,
-        subtype="html"
-    )
-    await fm.send_message(message)
\ No newline at end of file
+    }
+
+# --- Outbox dispatcher ---
+
+def _claim_batch():
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        return crud.claim_outbox_batch(db, OUTBOX_BATCH_SIZE, OUTBOX_LEASE_SECONDS)
+    finally:
+        db.close()
+
+def _mark_sent(email_id: int):
+    db = SessionLocal()
+    try:
+        crud.mark_email_sent(db, email_id)
+    finally:
+        db.close()
+
+def _mark_failed(email_id: int, error: str, retry_at):
+    db = SessionLocal()
+    try:
+        crud.mark_email_failed(db, email_id, error, retry_at)
+    finally:
+        db.close()
+
+def _prune():
+    db = SessionLocal()
+    try:
+        return crud.prune_outbox(db, datetime.now(timezone.utc) - timedelta(hours=OUTBOX_RETENTION_HOURS))
+    finally:
+        db.close()
+
+class OutboxDispatcher:
+    """
+    Background task that drains the email_outbox table in batches over one
+    reused SMTP connection, retrying failures with exponential backoff.
+    """
+
+    def __init__(self):
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._smtp = None
+        self._smtp_last_used = 0.0
+        self._pruned_at = 0.0
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+
+    def wake(self):
+        """Signals that new mail was queued, so it goes out without waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Email outbox dispatch failed: {e}")
+                delivered = 0
+            if delivered:
+                continue # There may be more due mail
+            if time.monotonic() - self._pruned_at > OUTBOX_PRUNE_INTERVAL_SECONDS:
+                self._pruned_at = time.monotonic()
+                try:
+                    await run_in_threadpool(_prune)
+                except Exception as e:
+                    print(f"Email outbox pruning failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._smtp is not None and asyncio.get_running_loop().time() - self._smtp_last_used > SMTP_IDLE_SECONDS:
+                await self._disconnect()
+
+    async def dispatch_once(self) -> int:
+        """Sends one batch of due emails; returns how many were attempted."""
+        emails = await run_in_threadpool(_claim_batch)
+        for email in emails:
+            started = time.perf_counter()
+            try:
+                await self._send(email)
+            except Exception as e:
+                metrics.SMTP_SEND_SECONDS.labels("error").observe(time.perf_counter() - started)
+                await self._disconnect()
+                attempts = email.attempts + 1
+                retry_at = None
+                if attempts < OUTBOX_MAX_ATTEMPTS:
+                    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF_SECONDS)
+                    retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                    metrics.EMAILS.labels("retry").inc()
+                else:
+                    self.failed += 1
+                    metrics.EMAILS.labels("failed").inc()
+                await run_in_threadpool(_mark_failed, email.id, str(e), retry_at)
+            else:
+                metrics.SMTP_SEND_SECONDS.labels("sent").observe(time.perf_counter() - started)
+                metrics.EMAILS.labels("sent").inc()
+                self.sent += 1
+                await run_in_threadpool(_mark_sent, email.id)
+        return len(emails)
+
+    async def _connect(self):
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        smtp = aiosmtplib.SMTP(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if conf.MAIL_USERNAME:
+            await smtp.login(conf.MAIL_USERNAME, conf.MAIL_PASSWORD.get_secret_value())
+        self._smtp = smtp
+        return smtp
+
+    async def _disconnect(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    async def _send(self, email):
+        message = EmailMessage()
+        message["From"] = conf.MAIL_FROM
+        message["To"] = email.recipient
+        message["Subject"] = email.subject
+        message.set_content(email.body, subtype=email.subtype)
+        smtp = await self._connect()
+        await smtp.send_message(message)
+        self._smtp_last_used = asyncio.get_running_loop().time()
+
+dispatcher = OutboxDispatcher()
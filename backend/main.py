@@ -2,14 +2,12 @@
 # Main_sample/backend_main/main.py
 
 # ... your existing imports like FastAPI, Depends, etc.
-import io
-import weasyprint
-
+import asyncio
 import re
 
 import os
 
-from mail import send_registration_email
+import mail
 
 
 
@@ -24,14 +22,12 @@ from auth import get_current_user, create_access_token, get_password_hash, ACCES
 
 import random
 import string
-from mail import send_otp_email
 from datetime import datetime
 
-from jinja2 import Template
 from fastapi.responses import Response
 
-from fastapi.responses import Response
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi.responses import Response, JSONResponse, StreamingResponse
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -39,19 +35,23 @@ from typing import List, Optional
 
 
 # Changed relative imports to absolute imports
-import models, schemas, crud, auth
-from database import engine, Base, get_db # Base is imported here for metadata.create_all
+import models, schemas, crud, crud_async, auth, pagination, resume_render, bulk_import, exports, http_cache, fast_json, query_stats, metrics, rate_limit
+import database, replicas
+from database import engine, async_engine, get_session, run_db
+from replicas import get_read_db
+from executors import PoolSaturated
 
-# Create all database tables
-# This should be called only once when the application starts
-# This line will attempt to connect to the database and create tables if they don't exist.
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations (see migrations/README.md):
+#   cd backend && alembic upgrade head
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 
 
 app = FastAPI(
     title="iIntern Darling Backend API",
-    description="API for managing internships, students, employers, and applications.",
+    description=(
+        "API for managing internships, students, employers, and applications. "
+        f"List endpoints return JSON arrays; the cursor for the next page is sent in the {pagination.NEXT_CURSOR_HEADER} header."
+    ),
     version="1.0.0",
 )
 
@@ -70,8 +70,71 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, query_stats.QUERIES_HEADER],
+)
+
+# Per-request query counting: debug headers and/or the N+1 detector (see query_stats.py)
+if query_stats.QUERY_STATS_ENABLED or query_stats.N_PLUS_ONE_THRESHOLD:
+    query_stats.instrument(engine)
+    if async_engine is not None:
+        query_stats.instrument(async_engine.sync_engine)
+    app.add_middleware(query_stats.QueryStatsMiddleware)
+
+# Read-your-writes pins for replica routing (see replicas.py)
+if replicas.router is not None:
+    app.add_middleware(replicas.ReadYourWritesMiddleware)
+
+# Cheap 429s for floods against the login, OTP and password endpoints (see rate_limit.py)
+if rate_limit.RATE_LIMIT_ENABLED:
+    app.add_middleware(rate_limit.RateLimitMiddleware)
+
+# Prometheus metrics, served at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_pool(engine, "sync")
+if async_engine is not None:
+    metrics.instrument_pool(async_engine.sync_engine, "async")
+
+# Set EMAIL_DISPATCHER_ENABLED=False on workers that should not deliver queued email
+EMAIL_DISPATCHER_ENABLED = os.getenv("EMAIL_DISPATCHER_ENABLED", "True").lower() in ("true", "1", "t")
+
+@app.on_event("startup")
+async def start_email_dispatcher():
+    if EMAIL_DISPATCHER_ENABLED:
+        mail.dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    await mail.dispatcher.stop()
+    auth.password_pool.shutdown()
+    resume_render.render_pool.shutdown()
+    metrics.mark_process_dead()
+
+@app.exception_handler(PoolSaturated)
+def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    # Shed load before any bcrypt or PDF work is queued; clients should retry shortly
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(pagination.InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: pagination.InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+# List endpoints keep returning bare JSON arrays, so existing clients are unaffected;
+# the next page's cursor travels in a response header instead of the body
+CURSOR_DESCRIPTION = (
+    f"Opaque cursor from the {pagination.NEXT_CURSOR_HEADER} response header of the previous page "
+    "(absent on the last page); replaces skip"
 )
 
+def set_next_cursor(response: Response, items, limit: int, key):
+    """Adds the cursor for the following page to the response headers, if there is one."""
+    cursor = pagination.next_cursor(items, limit, key)
+    if cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = cursor
+
 def is_strong_password(password: str):
     """
     Checks if a password meets the strength requirements:
@@ -96,302 +159,49 @@ def is_strong_password(password: str):
 
 
 
-# --- Integrated HTML Template for Resume Generation ---
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ personal_info.fullName }} - Resume</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Manrope:wght@300;400;500;600;700&display=swap');
-        body {
-            font-family: 'Manrope', 'Segoe UI', Arial, sans-serif;
-            background: #f8fafc;
-            color: #22223b;
-            font-size: 11pt;
-            margin: 0;
-        }
-        .container {
-            max-width: 820px;
-            margin: 40px auto;
-            background: #fff;
-            border-radius: 18px;
-            box-shadow: 0 4px 32px rgba(30,64,175,0.08), 0 1.5px 6px rgba(0,0,0,0.04);
-            padding: 48px 56px;
-        }
-        .header {
-            text-align: left;
-            border-bottom: 2.5px solid #2563eb;
-            padding-bottom: 18px;
-            margin-bottom: 32px;
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }
-        .name {
-            font-size: 28pt;
-            font-weight: 700;
-            color: #2563eb;
-            letter-spacing: 1px;
-        }
-        .contact-info {
-            font-size: 10.5pt;
-            color: #4b5563;
-            display: flex;
-            gap: 18px;
-            flex-wrap: wrap;
-        }
-        .contact-info a {
-            color: #2563eb;
-            text-decoration: underline;
-        }
-        .section {
-            margin-bottom: 32px;
-        }
-        .section-title {
-            font-size: 15pt;
-            font-weight: 700;
-            color: #22223b;
-            margin-bottom: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            border-bottom: 1.5px solid #e5e7eb;
-            padding-bottom: 6px;
-        }
-        .objective {
-            font-size: 11.5pt;
-            line-height: 1.7;
-            text-align: justify;
-            margin-bottom: 18px;
-            color: #3a3a3a;
-        }
-        .education-item {
-            margin-bottom: 12px;
-        }
-        .degree {
-            font-weight: 700;
-            font-size: 13pt;
-            color: #2563eb;
-        }
-        .college {
-            font-weight: 500;
-            color: #374151;
-            margin-bottom: 2px;
-        }
-        .education-details {
-            font-size: 10.5pt;
-            color: #6b7280;
-        }
-        .project-item, .experience-item, .certification-item {
-            margin-bottom: 18px;
-            padding: 16px 0 0 0;
-            border-top: 1px solid #e5e7eb;
-        }
-        .project-title, .role {
-            font-weight: 700;
-            font-size: 12.5pt;
-            color: #2563eb;
-        }
-        .company, .project-meta {
-            font-weight: 500;
-            color: #374151;
-            font-size: 10.5pt;
-            margin-bottom: 4px;
-        }
-        .tech-stack {
-            margin: 8px 0;
-        }
-        .tech-item {
-            display: inline-block;
-            background: #e0e7ff;
-            color: #2563eb;
-            padding: 3px 10px;
-            border-radius: 14px;
-            font-size: 9.5pt;
-            margin-right: 7px;
-            margin-bottom: 4px;
-        }
-        .responsibilities {
-            list-style: none;
-            padding-left: 0;
-            margin-top: 8px;
-        }
-        .responsibilities li {
-            margin-bottom: 6px;
-            padding-left: 18px;
-            position: relative;
-            font-size: 10.5pt;
-        }
-        .responsibilities li:before {
-            content: "•";
-            color: #2563eb;
-            font-weight: bold;
-            position: absolute;
-            left: 0;
-        }
-        .skills-list {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }
-        .skill-item {
-            background: #f3f4f6;
-            color: #2563eb;
-            padding: 5px 14px;
-            border-radius: 16px;
-            font-size: 10.5pt;
-            font-weight: 600;
-            box-shadow: 0 1px 4px rgba(37,99,235,0.07);
-        }
-        .certification-name {
-            font-weight: 700;
-            color: #2563eb;
-            font-size: 11.5pt;
-        }
-        .certification-details {
-            color: #374151;
-            font-size: 10.5pt;
-        }
-        .github-link {
-            color: #2563eb;
-            font-size: 10pt;
-            text-decoration: underline;
-        }
-        .date-range {
-            color: #6b7280;
-            font-size: 10.5pt;
-            float: right;
-        }
-        @media print {
-            .container {
-                padding: 20px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <span class="name">{{ personal_info.fullName }}</span>
-            <div class="contact-info">
-                <span>{{ personal_info.email }}</span>
-                <span>{{ personal_info.phone }}</span>
-                {% if personal_info.githubLink %}
-                <a href="{{ personal_info.githubLink }}">GitHub</a>
-                {% endif %}
-                {% if personal_info.linkedinProfile %}
-                <a href="{{ personal_info.linkedinProfile }}">LinkedIn</a>
-                {% endif %}
-            </div>
-        </div>
-
-        {% if objective %}
-        <div class="section">
-            <div class="section-title">Career Objective</div>
-            <p class="objective">{{ objective }}</p>
-        </div>
-        {% endif %}
-
-        <div class="section">
-            <div class="section-title">Education</div>
-            <div class="education-item">
-                <div class="degree">{{ education.degree }}</div>
-                <div class="college">{{ education.college }}</div>
-                <div class="education-details">
-                    CGPA: {{ education.cgpa }} | {{ education.startDate }} - {{ education.endDate }}
-                </div>
-            </div>
-        </div>
-
-        {% if projects %}
-        <div class="section">
-            <div class="section-title">Projects</div>
-            {% for project in projects %}
-            <div class="project-item">
-                <div style="display: flex; justify-content: space-between; align-items: baseline;">
-                    <div class="project-title">{{ project.title }}</div>
-                    {% if project.githubLink %}
-                    <a href="{{ project.githubLink }}" class="github-link">GitHub</a>
-                    {% endif %}
-                </div>
-                <p style="margin: 8px 0; line-height: 1.6;">{{ project.description }}</p>
-                {% if project.techStack %}
-                <div class="tech-stack">
-                    {% for tech in project.techStack %}
-                    <span class="tech-item">{{ tech }}</span>
-                    {% endfor %}
-                </div>
-                {% endif %}
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-
-        {% if experience %}
-        <div class="section">
-            <div class="section-title">Experience</div>
-            {% for exp in experience %}
-            <div class="experience-item">
-                <div style="display: flex; justify-content: space-between; align-items: baseline;">
-                    <div>
-                        <div class="role">{{ exp.role }}</div>
-                        <div class="company">{{ exp.company }}</div>
-                    </div>
-                    <div class="date-range">{{ exp.startDate }} - {{ exp.endDate }}</div>
-                </div>
-                {% if exp.responsibilities %}
-                <ul class="responsibilities">
-                    {% for responsibility in exp.responsibilities %}
-                    <li>{{ responsibility }}</li>
-                    {% endfor %}
-                </ul>
-                {% endif %}
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-
-        {% if skills %}
-        <div class="section">
-            <div class="section-title">Technical Skills</div>
-            <div class="skills-list">
-                {% for skill in skills %}
-                <span class="skill-item">{{ skill }}</span>
-                {% endfor %}
-            </div>
-        </div>
-        {% endif %}
-
-        {% if certifications %}
-        <div class="section">
-            <div class="section-title">Certifications</div>
-            {% for cert in certifications %}
-            <div class="certification-item">
-                <div class="certification-name">{{ cert.name }}</div>
-                <div class="certification-details">{{ cert.institution }} | {{ cert.year }}</div>
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-    </div>
-</body>
-</html>
-"""
 
 # --- API Endpoints ---
 
+# --- Health checks for orchestration ---
+
+@app.get("/healthz", include_in_schema=False)
+async def liveness():
+    """Liveness: the process is up and serving. Never touches the database."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readiness():
+    """
+    Readiness: 503 while the connection pool is saturated or SELECT 1 fails or
+    takes longer than READINESS_TIMEOUT_SECONDS, so traffic is routed elsewhere.
+    """
+    pool = database.pool_status()
+    if pool["saturated"]:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "reason": "connection pool saturated", "pool": pool})
+    try:
+        seconds = await database.ping()
+    except asyncio.TimeoutError:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "reason": "database timed out", "pool": pool})
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "reason": f"database error: {type(e).__name__}", "pool": pool})
+    return {"status": "ready", "database_ms": round(seconds * 1000, 2), "pool": database.pool_status()}
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Prometheus text exposition of the request, pool, executor and email metrics."""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/")
-def read_root():
+async def read_root():
     """Root endpoint for testing API availability."""
     return {"message": "Welcome to iIntern Darling Backend API!"}
 
 # --- Database Test Endpoint ---
-@app.get("/db-test")
-def test_db_connection(db: Session = Depends(get_db)):
+@app.get("/db-test", deprecated=True)
+async def test_db_connection(db: Session = Depends(get_session)):
     try:
-        first_user = db.query(models.User).first()
+        first_user = await run_db(db, lambda session: session.query(models.User).first())
         if first_user:
             return {"message": "Database connection successful!", "first_user_email": first_user.email}
         else:
@@ -401,9 +211,9 @@ def test_db_connection(db: Session = Depends(get_db)):
 
 # --- Sample User Endpoint ---
 @app.post("/add-sample-user", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def add_sample_user(db: Session = Depends(get_db)):
+async def add_sample_user(db: Session = Depends(get_session)):
     sample_email = "test.student@example.com"
-    db_user = crud.get_user_by_email(db, email=sample_email)
+    db_user = await crud_async.get_user_by_email(db, email=sample_email)
     if db_user:
         raise HTTPException(status_code=400, detail=f"Sample user '{sample_email}' already exists.")
     user_data = schemas.UserCreate(
@@ -412,30 +222,33 @@ def add_sample_user(db: Session = Depends(get_db)):
         address="123 Test St", bio="A sample student for testing purposes.",
         profile_picture_url="https://placehold.co/150x150/cccccc/ffffff?text=TS"
     )
-    new_user = crud.create_user(db=db, user=user_data)
+    hashed_password = await auth.get_password_hash_async(user_data.password)
+    new_user = await crud_async.create_user(db=db, user=user_data, hashed_password=hashed_password)
     return new_user
 
 # --- Authentication and User Registration ---
 @app.post("/register/student", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register_student(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register_student(user: schemas.UserCreate, db: Session = Depends(get_session)):
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     user.role = "student"
-    return crud.create_user(db=db, user=user)
+    hashed_password = await auth.get_password_hash_async(user.password)
+    return await crud_async.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @app.post("/register/employer", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register_employer(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register_employer(user: schemas.UserCreate, db: Session = Depends(get_session)):
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     user.role = "employer"
-    return crud.create_user(db=db, user=user)
+    hashed_password = await auth.get_password_hash_async(user.password)
+    return await crud_async.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @app.post("/login", response_model=schemas.Token)
-def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=form_data.email)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, email=form_data.email)
+    if not user or not await auth.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -443,12 +256,12 @@ def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depend
         )
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"id": user.id, "email": user.email, "role": user.role}, expires_delta=access_token_expires
+        data=auth.token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/users/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
+async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
 
 # --- NEW: Integrated Resume Generation Endpoint ---
@@ -458,45 +271,36 @@ async def generate_resume(
     current_user: models.User = Depends(auth.get_current_active_student)
 ):
     try:
-        template = Template(HTML_TEMPLATE)
-        html_content = template.render(
-            personal_info=resume_data.personalInfo,
-            objective=resume_data.objective,
-            education=resume_data.education[0] if resume_data.education else None,
-            projects=resume_data.projects,
-            experience=resume_data.experience,
-            skills=resume_data.skills,
-            certifications=resume_data.certifications
-        )
-        pdf_buffer = io.BytesIO()
-        weasyprint.HTML(string=html_content).write_pdf(pdf_buffer)
-        pdf_buffer.seek(0)
+        pdf = await resume_render.render(resume_data)
         return Response(
-            content=pdf_buffer.getvalue(),
+            content=pdf,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={resume_data.personalInfo.fullName.replace(' ', '_')}_Resume.pdf"
             }
         )
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
 @app.get("/")
-def read_root():
+async def read_root():
     """Root endpoint for testing API availability."""
     return {"message": "Welcome to iIntern Darling Backend API!"}
 
 # --- ENDPOINT FOR DATABASE CONNECTION TEST ---
-@app.get("/db-test")
-def test_db_connection(db: Session = Depends(get_db)):
+@app.get("/db-test", deprecated=True)
+async def test_db_connection(db: Session = Depends(get_session)):
     """
     Tests the database connection by attempting to fetch the first user.
     If no users exist, it returns a success message indicating connection.
-    This also implicitly checks if tables were created by Base.metadata.create_all.
+    This also implicitly checks if the migrations have created the tables.
+    Orchestrators should probe /healthz and /readyz instead.
     """
     try:
         # Attempt to query the 'users' table
-        first_user = db.query(models.User).first()
+        first_user = await run_db(db, lambda session: session.query(models.User).first())
         if first_user:
             return {"message": "Database connection successful!", "first_user_email": first_user.email}
         else:
@@ -507,7 +311,7 @@ def test_db_connection(db: Session = Depends(get_db)):
 
 # --- NEW ENDPOINT TO ADD SAMPLE DATA ---
 @app.post("/add-sample-user", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def add_sample_user(db: Session = Depends(get_db)):
+async def add_sample_user(db: Session = Depends(get_session)):
     """
     Adds a sample student user to the database for testing purposes.
     If the user already exists, it returns a message indicating so.
@@ -515,7 +319,7 @@ def add_sample_user(db: Session = Depends(get_db)):
     sample_email = "test.student@example.com"
     sample_password = "testpassword123"
 
-    db_user = crud.get_user_by_email(db, email=sample_email)
+    db_user = await crud_async.get_user_by_email(db, email=sample_email)
     if db_user:
         raise HTTPException(status_code=400, detail=f"Sample user '{sample_email}' already exists.")
 
@@ -530,7 +334,8 @@ def add_sample_user(db: Session = Depends(get_db)):
         bio="A sample student for testing purposes.",
         profile_picture_url="https://placehold.co/150x150/cccccc/ffffff?text=TS"
     )
-    new_user = crud.create_user(db=db, user=user_data)
+    hashed_password = await auth.get_password_hash_async(user_data.password)
+    new_user = await crud_async.create_user(db=db, user=user_data, hashed_password=hashed_password)
     return new_user
 # --- END NEW ENDPOINT ---
 
@@ -538,28 +343,30 @@ def add_sample_user(db: Session = Depends(get_db)):
 # --- Authentication and User Registration ---
 
 @app.post("/register/student", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register_student(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register_student(user: schemas.UserCreate, db: Session = Depends(get_session)):
     """Register a new student user."""
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     user.role = "student" # Ensure role is student
-    return crud.create_user(db=db, user=user)
+    hashed_password = await auth.get_password_hash_async(user.password)
+    return await crud_async.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @app.post("/register/employer", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register_employer(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register_employer(user: schemas.UserCreate, db: Session = Depends(get_session)):
     """Register a new employer user."""
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     user.role = "employer" # Ensure role is employer
-    return crud.create_user(db=db, user=user)
+    hashed_password = await auth.get_password_hash_async(user.password)
+    return await crud_async.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @app.post("/login", response_model=schemas.Token)
-def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depends(get_session)):
     """Authenticate user and return an access token."""
-    user = crud.get_user_by_email(db, email=form_data.email)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    user = await crud_async.get_user_by_email(db, email=form_data.email)
+    if not user or not await auth.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -567,62 +374,83 @@ def login_for_access_token(form_data: schemas.LoginRequest, db: Session = Depend
         )
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"id": user.id, "email": user.email, "role": user.role}, expires_delta=access_token_expires
+        data=auth.token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/users/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
+async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     """Get details of the current authenticated user."""
     return current_user
 
 # --- User Management (Admin Only) ---
 
 @app.get("/admin/users", response_model=List[schemas.UserResponse])
-def read_all_users(
+async def read_all_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     role: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Retrieve a list of all users (Admin only)."""
-    users = crud.get_users(db, skip=skip, limit=limit, role=role)
-    return users
+    users = await crud_async.get_users(db, skip=skip, limit=limit, role=role, cursor=cursor)
+    set_next_cursor(response, users, limit, crud.USER_PAGE_KEY)
+    return fast_json.list_response(schemas.UserResponse, users, headers=response.headers)
+
+@app.get("/admin/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("ndjson", description="'ndjson' or 'csv'"),
+    current_user: models.User = Depends(auth.get_current_active_admin)
+):
+    """Stream every row of users, internships or applications as NDJSON or CSV (Admin only)."""
+    if table not in exports.EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{table}'")
+    if format not in exports.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}', expected 'ndjson' or 'csv'")
+    return StreamingResponse(
+        exports.stream_export(table, format),
+        media_type=exports.FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename={table}.{format}"},
+    )
 
 @app.get("/admin/users/{user_id}", response_model=schemas.UserResponse)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Retrieve a specific user by ID (Admin only)."""
-    user = crud.get_user(db, user_id=user_id)
+    user = await crud_async.get_user(db, user_id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @app.put("/admin/users/{user_id}", response_model=schemas.UserResponse)
-def update_user_by_admin(
+async def update_user_by_admin(
     user_id: int,
     user_update: schemas.UserUpdate,
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Update a user's details by ID (Admin only)."""
-    user = crud.update_user(db, user_id=user_id, user_update=user_update)
+    hashed_password = await auth.get_password_hash_async(user_update.password) if user_update.password else None
+    user = await crud_async.update_user(db, user_id=user_id, user_update=user_update, hashed_password=hashed_password)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @app.delete("/admin/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_by_admin(
+async def delete_user_by_admin(
     user_id: int,
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Delete a user by ID (Admin only)."""
-    success = crud.delete_user(db, user_id=user_id)
+    success = await crud_async.delete_user(db, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
@@ -630,39 +458,41 @@ def delete_user_by_admin(
 # --- Student Profile Management ---
 
 @app.get("/students/me/profile", response_model=schemas.StudentProfileResponse)
-def read_my_student_profile(
+async def read_my_student_profile(
     current_user: models.User = Depends(auth.get_current_active_student),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Get the current student's profile."""
-    if not current_user.student_profile:
+    profile = await crud_async.get_student_profile(db, user_id=current_user.id)
+    if not profile:
         raise HTTPException(status_code=404, detail="Student profile not found")
     return current_user
 
 @app.put("/students/me/profile", response_model=schemas.StudentProfileResponse)
-def update_my_student_profile(
+async def update_my_student_profile(
     profile_update: schemas.StudentProfileUpdate,
     current_user: models.User = Depends(auth.get_current_active_student),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Update the current student's profile."""
-    profile = crud.update_student_profile(db, user_id=current_user.id, profile_update=profile_update)
+    profile = await crud_async.update_student_profile(db, user_id=current_user.id, profile_update=profile_update)
     if profile is None:
         raise HTTPException(status_code=404, detail="Student profile not found")
-    db.refresh(current_user)
+    await run_db(db, Session.refresh, current_user)
     return current_user
 
 @app.get("/applicants/{user_id}/profile", response_model=schemas.StudentProfileResponse)
-def read_applicant_profile(
+async def read_applicant_profile(
     user_id: int,
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Get a specific applicant's profile by user ID (Employer only)."""
-    user = crud.get_user(db, user_id=user_id)
+    user = await crud_async.get_user(db, user_id=user_id)
     if not user or user.role != "student":
         raise HTTPException(status_code=404, detail="Applicant (student) not found")
-    if not user.student_profile:
+    profile = await crud_async.get_student_profile(db, user_id=user.id)
+    if not profile:
         raise HTTPException(status_code=404, detail="Student profile not found for this applicant")
     return user
 
@@ -670,24 +500,24 @@ def read_applicant_profile(
 # --- Employer Profile Management ---
 
 @app.get("/employers/me/profile", response_model=schemas.EmployerProfileResponse)
-def read_my_employer_profile(
-    current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+async def read_my_employer_profile(
+    current_user: schemas.TokenData = Depends(auth.employer_claims),
+    db: Session = Depends(get_session)
 ):
     """Get the current employer's profile."""
-    profile = crud.get_employer_profile(db, user_id=current_user.id)
+    profile = await crud_async.get_employer_profile(db, user_id=current_user.id)
     if profile is None:
         raise HTTPException(status_code=404, detail="Employer profile not found")
     return profile
 
 @app.put("/employers/me/profile", response_model=schemas.EmployerProfileResponse)
-def update_my_employer_profile(
+async def update_my_employer_profile(
     profile_update: schemas.EmployerProfileUpdate,
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Update the current employer's profile."""
-    profile = crud.update_employer_profile(db, user_id=current_user.id, profile_update=profile_update)
+    profile = await crud_async.update_employer_profile(db, user_id=current_user.id, profile_update=profile_update)
     if profile is None:
         raise HTTPException(status_code=404, detail="Employer profile not found")
     return profile
@@ -695,188 +525,271 @@ def update_my_employer_profile(
 # --- Internship Management ---
 
 @app.post("/internships", response_model=schemas.InternshipResponse, status_code=status.HTTP_201_CREATED)
-def create_new_internship(
+async def create_new_internship(
     internship: schemas.InternshipCreate,
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Post a new internship (Employer only)."""
-    return crud.create_internship(db=db, internship=internship, employer_id=current_user.id)
+    return await crud_async.create_internship(db=db, internship=internship, employer_id=current_user.id)
 
-@app.get("/internships", response_model=List[schemas.InternshipResponse])
-def read_internships(
+@app.post("/employers/me/internships/bulk", response_model=schemas.BulkImportReport)
+async def bulk_import_internships(
+    request: Request,
+    format: Optional[str] = Query(None, description="'csv' or 'ndjson'; defaults to the Content-Type"),
+    current_user: models.User = Depends(auth.get_current_active_employer),
+    db: Session = Depends(get_session)
+):
+    """
+    Import internships from a CSV (header row of InternshipCreate fields) or NDJSON
+    upload sent as the raw request body. The body is parsed as it streams in and
+    valid rows are inserted in batches; invalid rows are reported by line number.
+    """
+    try:
+        upload_format = bulk_import.detect_format(request.headers.get("content-type"), format)
+    except bulk_import.UnsupportedFormat as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    return await bulk_import.import_internships(db, request.stream(), upload_format, employer_id=current_user.id)
+
+@app.get("/internships", response_model=List[schemas.InternshipSearchResponse])
+async def read_internships(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     search_query: Optional[str] = Query(None, description="Search by title, description, or location"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    active_only: bool = Query(False, description="Only list internships that are still active"),
+    db: Session = Depends(get_read_db)
 ):
-    """Retrieve a list of all active internships."""
-    internships = crud.get_internships(db, skip=skip, limit=limit, search_query=search_query)
-    return internships
+    """
+    Retrieve a list of all active internships.
+    With a search query, results are ordered by relevance and include a highlighted snippet.
+    Responses carry an ETag; a matching If-None-Match is answered with 304.
+    """
+    if search_query and cursor:
+        raise HTTPException(status_code=400, detail="Search results are paginated with skip, not cursor")
+    internships = await crud_async.get_internships(db, skip=skip, limit=limit, search_query=search_query, cursor=cursor, active_only=active_only)
+    # Search ranks drift with posting age, so a search page is only weakly validated
+    etag = http_cache.listing_etag(
+        internships, (skip, limit, search_query, cursor, active_only), weak=bool(search_query)
+    )
+    if not search_query:
+        set_next_cursor(response, internships, limit, crud.INTERNSHIP_PAGE_KEY)
+    response.headers.update(http_cache.cache_headers(etag))
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified(response.headers)
+    return fast_json.list_response(schemas.InternshipSearchResponse, internships, headers=response.headers)
+
+@app.get("/internships/facets", response_model=schemas.InternshipFacets)
+async def read_internship_facets(
+    search_query: Optional[str] = Query(None, description="Count only internships matching this search"),
+    db: Session = Depends(get_read_db)
+):
+    """Internship counts by location, stipend, duration and active/expired status."""
+    return await crud_async.get_internship_facets(db, search_query=search_query)
 
 @app.get("/internships/{internship_id}", response_model=schemas.InternshipResponse)
-def read_internship_detail(internship_id: int, db: Session = Depends(get_db)):
-    """Retrieve details of a specific internship."""
-    internship = crud.get_internship(db, internship_id=internship_id)
+async def read_internship_detail(internship_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """
+    Retrieve details of a specific internship.
+    Supports If-None-Match / If-Modified-Since revalidation with 304 responses.
+    """
+    internship = await crud_async.get_internship(db, internship_id=internship_id)
     if internship is None:
         raise HTTPException(status_code=404, detail="Internship not found")
+    etag = http_cache.internship_etag(internship)
+    last_modified = http_cache.internship_last_modified(internship)
+    response.headers.update(http_cache.cache_headers(etag, last_modified))
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(response.headers)
     return internship
 
 @app.put("/internships/{internship_id}", response_model=schemas.InternshipResponse)
-def update_existing_internship(
+async def update_existing_internship(
     internship_id: int,
     internship_update: schemas.InternshipUpdate,
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Update an existing internship (Employer only, must own the internship)."""
-    internship = crud.get_internship(db, internship_id=internship_id)
+    internship = await crud_async.get_internship(db, internship_id=internship_id)
     if not internship:
         raise HTTPException(status_code=404, detail="Internship not found")
     if internship.employer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this internship")
 
-    updated_internship = crud.update_internship(db, internship_id=internship_id, internship_update=internship_update)
+    updated_internship = await crud_async.update_internship(db, internship_id=internship_id, internship_update=internship_update)
     return updated_internship
 
 @app.delete("/internships/{internship_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_internship(
+async def delete_existing_internship(
     internship_id: int,
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Delete an internship (Employer only, must own the internship)."""
-    internship = crud.get_internship(db, internship_id=internship_id)
+    internship = await crud_async.get_internship(db, internship_id=internship_id)
     if not internship:
         raise HTTPException(status_code=404, detail="Internship not found")
     if internship.employer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this internship")
 
-    success = crud.delete_internship(db, internship_id=internship_id)
+    success = await crud_async.delete_internship(db, internship_id=internship_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete internship")
     return {"message": "Internship deleted successfully"}
 
 @app.get("/employers/me/internships", response_model=List[schemas.InternshipResponse])
-def read_employer_internships(
+async def read_employer_internships(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    current_user: schemas.TokenData = Depends(auth.employer_claims),
+    db: Session = Depends(get_session)
 ):
     """Get all internships posted by the current employer."""
-    internships = crud.get_internships(db, skip=skip, limit=limit, employer_id=current_user.id)
+    internships = await crud_async.get_internships(db, skip=skip, limit=limit, employer_id=current_user.id, cursor=cursor)
+    set_next_cursor(response, internships, limit, crud.INTERNSHIP_PAGE_KEY)
     return internships
 
+@app.get("/employers/me/dashboard", response_model=schemas.EmployerDashboard)
+async def read_employer_dashboard(
+    current_user: schemas.TokenData = Depends(auth.employer_claims),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Application counts by status, hired totals and latest application time for
+    every internship the current employer owns, in one query. Replaces fetching
+    /internships/{id}/applicants per posting.
+    """
+    internships = await crud_async.get_employer_dashboard(db, employer_id=current_user.id)
+    return {
+        "total_applications": sum(entry["total_applications"] for entry in internships),
+        "hired": sum(entry["hired"] for entry in internships),
+        "internships": internships,
+    }
+
 # --- Application Management ---
-def get_current_user_with_refill(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+async def get_current_user_with_refill(db: Session = Depends(get_session), current_user: models.User = Depends(auth.get_current_user)):
     """
     Checks if the user's free credits should be refilled and does so if needed.
     """
     if not current_user.is_premium and current_user.role == 'student':
         # Check if it has been more than 30 days since the last refill
         if current_user.last_credit_refill < datetime.now(timezone.utc) - timedelta(days=30):
-            current_user.credits = 5
-            current_user.last_credit_refill = datetime.now(timezone.utc)
-            db.commit()
-            db.refresh(current_user)
+            await crud_async.refill_free_credits(db, user=current_user)
     return current_user
 
 @app.post("/internships/{internship_id}/apply", response_model=schemas.ApplicationResponse, status_code=status.HTTP_201_CREATED)
-def apply_for_internship(
+async def apply_for_internship(
     internship_id: int,
     application: schemas.ApplicationBase,
     current_user: models.User = Depends(auth.get_current_active_student),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Student applies for an internship."""
     if current_user.role != 'student':
         raise HTTPException(status_code=403, detail="Only students can apply for internships.")
 
 
-    internship = crud.get_internship(db, internship_id=internship_id)
-    if not internship:
-        raise HTTPException(status_code=404, detail="Internship not found")
-    
-     # Credit check logic
-    if not current_user.is_premium:
-        if current_user.credits < 1:
-            raise HTTPException(status_code=403, detail="You do not have enough credits to apply.")
-        current_user.credits -= 1
-        db.commit()
-        db.refresh(current_user)
-
     application_create_data = schemas.ApplicationCreate(
         internship_id=internship_id,
         cover_letter=application.cover_letter,
         status=application.status
     )
-    db_application = crud.create_application(db, application=application_create_data, student_id=current_user.id)
-    if db_application is None:
+    # The credit debit, the insert and the ledger entry commit together
+    try:
+        db_application = await crud_async.create_application(
+            db, application=application_create_data, student_id=current_user.id, charge_credit=not current_user.is_premium
+        )
+    except crud.InsufficientCredits:
+        raise HTTPException(status_code=403, detail="You do not have enough credits to apply.")
+    except crud.AlreadyApplied:
         raise HTTPException(status_code=400, detail="Already applied to this internship")
+    if db_application is None:
+        raise HTTPException(status_code=404, detail="Internship not found")
     return db_application
 
 @app.get("/students/me/applications", response_model=List[schemas.ApplicationResponse])
-def read_my_applications(
+async def read_my_applications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(auth.get_current_active_student),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    current_user: schemas.TokenData = Depends(auth.student_claims),
+    db: Session = Depends(get_session)
 ):
     """Get all applications made by the current student."""
-    applications = crud.get_applications_by_student(db, student_id=current_user.id, skip=skip, limit=limit)
-    return applications
+    applications = await crud_async.get_applications_by_student(db, student_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, applications, limit, crud.APPLICATION_PAGE_KEY)
+    return fast_json.list_response(schemas.ApplicationResponse, applications, headers=response.headers)
+
+@app.get("/students/me/recommended-internships", response_model=List[schemas.RecommendedInternship])
+async def read_recommended_internships(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.TokenData = Depends(auth.student_claims),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Active internships that best match the current student's profile skills and
+    experience, best first. Internships already applied to are left out.
+    """
+    internships = await crud_async.recommend_internships(db, student_id=current_user.id, limit=limit)
+    if internships is None:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+    return fast_json.list_response(schemas.RecommendedInternship, internships, headers=response.headers)
 
 @app.get("/internships/{internship_id}/applicants", response_model=List[schemas.ApplicationResponse])
-def read_applicants_for_internship(
+async def read_applicants_for_internship(
     internship_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    current_user: schemas.TokenData = Depends(auth.employer_claims),
+    db: Session = Depends(get_session)
 ):
     """Get all applicants for a specific internship (Employer only, must own the internship)."""
-    internship = crud.get_internship(db, internship_id=internship_id)
+    internship = await crud_async.get_internship(db, internship_id=internship_id)
     if not internship:
         raise HTTPException(status_code=404, detail="Internship not found")
     if internship.employer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view applicants for this internship")
 
-    applications = crud.get_applications_by_internship(db, internship_id=internship.id, skip=skip, limit=limit)
+    applications = await crud_async.get_applications_by_internship(db, internship_id=internship.id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, applications, limit, crud.APPLICATION_PAGE_KEY)
     return applications
 
 @app.put("/applications/{application_id}/status", response_model=schemas.ApplicationResponse)
-def update_application_status(
+async def update_application_status(
     application_id: int,
     new_status: str = Query(..., description="New status for the application (e.g., 'reviewed', 'accepted', 'rejected', 'hired')"),
     current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Update the status of an application (Employer only)."""
-    application = crud.get_application(db, application_id=application_id)
+    application = await crud_async.get_application(db, application_id=application_id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    internship = crud.get_internship(db, internship_id=application.internship_id)
+    internship = await crud_async.get_internship(db, internship_id=application.internship_id)
     if not internship or internship.employer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this application's status")
     
-    # Credit deduction for accepting an offer (when status is 'hired')
-    if new_status.lower() == 'hired':
-        student = crud.get_user(db, user_id=application.student_id)
-        if student and not student.is_premium:
-            if student.credits < 1:
-                raise HTTPException(status_code=403, detail="The student does not have enough credits to accept this offer.")
-            student.credits -= 1
-            db.commit()
-
-    updated_application = crud.update_application_status(db, application_id=application_id, new_status=new_status)
+    # Moving to 'hired' debits the student's credit in the same transaction
+    try:
+        updated_application = await crud_async.update_application_status(db, application_id=application_id, new_status=new_status)
+    except crud.InsufficientCredits:
+        raise HTTPException(status_code=403, detail="The student does not have enough credits to accept this offer.")
     return updated_application
 
 @app.post("/users/me/top-up-credits", response_model=schemas.UserResponse)
-def top_up_credits(
+async def top_up_credits(
     current_user: models.User = Depends(get_current_user_with_refill),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """
     Simulates a top-up of 2 credits for the current user.
@@ -884,48 +797,47 @@ def top_up_credits(
     if current_user.role != 'student':
         raise HTTPException(status_code=403, detail="Only students can top-up credits.")
 
-    current_user.credits += 2
-    db.commit()
-    db.refresh(current_user)
+    await crud_async.top_up_credits(db, user_id=current_user.id, amount=2)
     return current_user
 
 @app.get("/hired-interns", response_model=List[schemas.ApplicationResponse])
-def get_hired_interns(
+async def get_hired_interns(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(auth.get_current_active_employer),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    current_user: schemas.TokenData = Depends(auth.employer_claims),
+    db: Session = Depends(get_session)
 ):
     """Get a list of interns hired by the current employer."""
-    employer_internships = crud.get_internships(db, employer_id=current_user.id)
-    hired_applications = []
-    for internship in employer_internships:
-        applications = crud.get_applications_by_internship(db, internship_id=internship.id)
-        hired_applications.extend([app for app in applications if app.status == "hired"])
-
-    return hired_applications[skip : skip + limit]
+    hired_applications = await crud_async.get_hired_applications(db, employer_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, hired_applications, limit, crud.APPLICATION_PAGE_KEY)
+    return hired_applications
 
 # --- Admin Internship Management (Admin Only) ---
 
 @app.get("/admin/internships", response_model=List[schemas.InternshipResponse])
-def read_all_internships_admin(
+async def read_all_internships_admin(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Retrieve all internships (Admin only)."""
-    internships = crud.get_internships(db, skip=skip, limit=limit)
+    internships = await crud_async.get_internships(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, internships, limit, crud.INTERNSHIP_PAGE_KEY)
     return internships
 
 @app.delete("/admin/internships/{internship_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_internship_by_admin(
+async def delete_internship_by_admin(
     internship_id: int,
     current_user: models.User = Depends(auth.get_current_active_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
     """Delete an internship by ID (Admin only)."""
-    success = crud.delete_internship(db, internship_id=internship_id)
+    success = await crud_async.delete_internship(db, internship_id=internship_id)
     if not success:
         raise HTTPException(status_code=404, detail="Internship not found")
     return {"message": "Internship deleted successfully"}
@@ -935,7 +847,6 @@ def delete_internship_by_admin(
 # ... existing imports
 import random
 import string
-from mail import send_otp_email
 from datetime import datetime
 
 # ... existing code
@@ -946,21 +857,21 @@ def generate_otp(length: int = 6):
     return "".join(random.choice(characters) for _ in range(length))
 
 @app.post("/forgot-password")
-async def forgot_password(request: schemas.ForgotPasswordRequest, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=request.email)
+async def forgot_password(request: schemas.ForgotPasswordRequest, db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, email=request.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     otp = generate_otp()
-    crud.set_user_otp(db, user=user, otp=otp)
-
-    await send_otp_email(email=user.email, otp=otp)
+    # The email is queued with the OTP and delivered by the outbox dispatcher
+    await crud_async.set_user_otp(db, user=user, otp=otp, email=mail.otp_email(otp))
+    mail.dispatcher.wake()
     return {"message": "OTP sent to your email address."}
 
 
 @app.post("/reset-password")
-def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=request.email)
+async def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, email=request.email)
 
     if not user or user.otp != request.otp:
         raise HTTPException(status_code=400, detail="Invalid OTP")
@@ -968,7 +879,8 @@ def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(
     if user.otp_expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="OTP has expired")
 
-    crud.reset_user_password(db, user=user, new_password=request.new_password)
+    hashed_password = await auth.get_password_hash_async(request.new_password)
+    await crud_async.reset_user_password(db, user=user, new_password=request.new_password, hashed_password=hashed_password)
     return {"message": "Password has been reset successfully."}
 
 # === STEP 1: REQUEST OTP ===
@@ -976,8 +888,8 @@ def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(
 
 # === STEP 2: VERIFY AND COMPLETE REGISTRATION ===
 @app.post("/verify-and-register", response_model=schemas.Token)
-def verify_and_register(verification_data: schemas.UserVerify, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=verification_data.email)
+async def verify_and_register(verification_data: schemas.UserVerify, db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, email=verification_data.email)
 
     # Validate OTP
     if not user or user.otp != verification_data.otp:
@@ -986,51 +898,52 @@ def verify_and_register(verification_data: schemas.UserVerify, db: Session = Dep
         raise HTTPException(status_code=400, detail="OTP has expired")
 
     # Activate user
-    crud.verify_user(db, user=user)
+    await crud_async.verify_user(db, user=user)
 
     # Create and return access token for immediate login
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}, expires_delta=access_token_expires
+        data=auth.token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/request-register-otp", status_code=200)
-async def request_registration_otp(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
+async def request_registration_otp(user_data: schemas.UserCreate, db: Session = Depends(get_session)):
     # 1. Validate Password Strength
     is_strong, message = is_strong_password(user_data.password)
     if not is_strong:
         raise HTTPException(status_code=400, detail=message)
 
-    # 2. Check if user exists
-    db_user = crud.get_user_by_email(db, email=user_data.email)
-    if db_user and db_user.is_verified:
-        raise HTTPException(status_code=400, detail="Email already registered and verified.")
+    # Hashed up front so no connection is held open while bcrypt runs
+    hashed_password = await auth.get_password_hash_async(user_data.password)
 
-    # 3. Create or update the unverified user
-    if not db_user:
-        crud.create_user(db=db, user=user_data, is_verified=False)
-    else:
-        crud.update_unverified_user(db=db, user_data=user_data)
+    # Steps 2-4 are one transaction, committed when the block exits
+    async with crud_async.transaction(db):
+        # 2. Check if user exists
+        db_user = await crud_async.get_user_by_email(db, email=user_data.email)
+        if db_user and db_user.is_verified:
+            raise HTTPException(status_code=400, detail="Email already registered and verified.")
 
-    # 4. Send OTP
-    user_to_verify = crud.get_user_by_email(db, email=user_data.email)
-    otp = generate_otp()
-    crud.set_user_otp(db, user=user_to_verify, otp=otp)
+        # 3. Create or update the unverified user
+        if not db_user:
+            user_to_verify = await crud_async.create_user(db=db, user=user_data, is_verified=False, hashed_password=hashed_password)
+        else:
+            user_to_verify = await crud_async.update_unverified_user(db=db, user_data=user_data, hashed_password=hashed_password)
+
+        # 4. Store the OTP and queue its email
+        otp = generate_otp()
+        await crud_async.set_user_otp(db, user=user_to_verify, otp=otp, email=mail.registration_email(otp))
+
+    # 5. Let the outbox dispatcher deliver it now rather than at its next poll
+    mail.dispatcher.wake()
 
-    # 5. Await the new email function
-    print(f"Attempting to send registration OTP to {user_data.email}")
-    await send_registration_email(email=user_data.email, otp=otp)
-    print("Registration OTP email sent successfully.")
-    
-    
     return {"message": "Verification OTP sent to your email. It will expire in 10 minutes."}
 
 
 # === STEP 2: VERIFY AND COMPLETE REGISTRATION ===
 @app.post("/verify-and-register", response_model=schemas.Token)
-def verify_and_register(verification_data: schemas.UserVerify, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=verification_data.email)
+async def verify_and_register(verification_data: schemas.UserVerify, db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, email=verification_data.email)
 
     # Validate OTP
     if not user or user.otp != verification_data.otp:
@@ -1039,11 +952,11 @@ def verify_and_register(verification_data: schemas.UserVerify, db: Session = Dep
         raise HTTPException(status_code=400, detail="OTP has expired")
 
     # Activate user
-    crud.verify_user(db, user=user)
+    await crud_async.verify_user(db, user=user)
 
     # Create and return access token for immediate login
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}, expires_delta=access_token_expires
+        data=auth.token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
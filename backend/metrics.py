@@ -0,0 +1,114 @@
+# backend/metrics.py
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+
+# With several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory shared by all of them *before* they start. Each worker then writes its
+# samples there and /metrics on any worker reports the sum over all workers.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WORK_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# --- HTTP ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to the end of the response, by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSES = Counter("http_responses_total", "Responses by route template and status code", ["method", "route", "status"])
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled", multiprocess_mode="livesum")
+
+# --- Database pool ---
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out of the pool", ["engine"], multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond the pool size", ["engine"], multiprocess_mode="livesum")
+
+# --- Worker pools (bcrypt, WeasyPrint) ---
+
+EXECUTOR_WORK_SECONDS = Histogram(
+    "executor_work_seconds", "Time a task spent running on a bounded executor", ["pool", "task"], buckets=WORK_BUCKETS,
+)
+EXECUTOR_WAIT_SECONDS = Histogram(
+    "executor_wait_seconds", "Time a task waited for a free executor worker", ["pool"], buckets=WORK_BUCKETS,
+)
+EXECUTOR_IN_FLIGHT = Gauge("executor_in_flight", "Tasks running or queued on an executor", ["pool"], multiprocess_mode="livesum")
+EXECUTOR_REJECTED = Counter("executor_rejected_total", "Tasks rejected because the executor was saturated", ["pool"])
+RESUME_CACHE = Counter("resume_pdf_requests_total", "Resume PDFs by how they were served", ["result"]) # hit, shared, rendered
+
+# --- Email ---
+
+SMTP_SEND_SECONDS = Histogram("smtp_send_seconds", "Time to hand one message to the SMTP server", ["outcome"], buckets=WORK_BUCKETS)
+EMAILS = Counter("outbox_emails_total", "Outbox deliveries by outcome", ["outcome"]) # sent, retry, failed
+
+# --- Rate limiting ---
+
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected by the rate limiter", ["route", "key"]) # key: ip, email
+
+# --- Collection ---
+
+def _pool_gauges(pool, name: str):
+    # Only QueuePool has these; SQLite :memory: and NullPool do not pool connections
+    if hasattr(pool, "checkedout"):
+        DB_POOL_SIZE.labels(name).set(pool.size())
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+def instrument_pool(engine, name: str):
+    """Keeps the pool gauges for `engine` (an Engine or an AsyncEngine's sync_engine) current."""
+    pool = engine.pool
+    event.listen(pool, "checkout", lambda *_: _pool_gauges(pool, name))
+    event.listen(pool, "checkin", lambda *_: _pool_gauges(pool, name))
+    _pool_gauges(pool, name)
+
+def render_latest():
+    """(body, content type) for a scrape, summed over workers in multiprocess mode."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead():
+    """Drops this worker's live gauges from the shared directory on shutdown."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route. The route template
+    (e.g. /internships/{internship_id}) is the label, so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], template).observe(time.perf_counter() - start)
+            HTTP_RESPONSES.labels(scope["method"], template, str(status)).inc()
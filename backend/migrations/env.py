@@ -0,0 +1,53 @@
+# backend/migrations/env.py
+
+from logging.config import fileConfig
+
+from alembic import context
+
+import models # Registers every table on Base.metadata
+from database import Base, engine, DATABASE_URL
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Full-text search objects created by migration 0003 (see search.py), which are
+# not on the models: the SQLite FTS5 table and its shadow tables, and the
+# PostgreSQL generated column and GIN index. Autogenerate would drop them.
+SEARCH_TABLE_PREFIX = "internships_fts"
+SEARCH_COLUMNS = {("internships", "search_vector")}
+SEARCH_INDEXES = {"ix_internships_search_vector"}
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table":
+        return not name.startswith(SEARCH_TABLE_PREFIX)
+    if type_ == "column":
+        return (object.table.name, name) not in SEARCH_COLUMNS
+    if type_ == "index":
+        return name not in SEARCH_INDEXES
+    return True
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting (alembic upgrade head --sql)."""
+    context.configure(
+        url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True, render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        # Batch mode lets ALTER-style operations work on SQLite
+        context.configure(
+            connection=connection, target_metadata=target_metadata, render_as_batch=True, include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,99 @@
+"""baseline schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations existed already have these tables; mark
+them with `alembic stamp 0001` and then run `alembic upgrade head`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("phone_number", sa.String(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("profile_picture_url", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_verified", sa.Boolean(), nullable=True),
+        sa.Column("credits", sa.Integer(), nullable=True),
+        sa.Column("is_premium", sa.Boolean(), nullable=True),
+        sa.Column("last_credit_refill", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("otp", sa.String(), nullable=True),
+        sa.Column("otp_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "student_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+        sa.Column("education", sa.Text(), nullable=True),
+        sa.Column("skills", sa.Text(), nullable=True),
+        sa.Column("experience", sa.Text(), nullable=True),
+        sa.Column("resume_url", sa.String(), nullable=True),
+        sa.Column("portfolio_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_student_profiles_id", "student_profiles", ["id"])
+
+    op.create_table(
+        "employer_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+        sa.Column("company_name", sa.String(), nullable=False),
+        sa.Column("company_description", sa.Text(), nullable=True),
+        sa.Column("website", sa.String(), nullable=True),
+        sa.Column("industry", sa.String(), nullable=True),
+        sa.Column("company_logo_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_employer_profiles_id", "employer_profiles", ["id"])
+
+    op.create_table(
+        "internships",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("requirements", sa.Text(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("stipend", sa.String(), nullable=True),
+        sa.Column("duration", sa.String(), nullable=True),
+        sa.Column("posted_date", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("deadline_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_internships_id", "internships", ["id"])
+
+    op.create_table(
+        "applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("internship_id", sa.Integer(), sa.ForeignKey("internships.id"), nullable=False),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("applied_date", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("cover_letter", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_applications_id", "applications", ["id"])
+
+def downgrade():
+    op.drop_table("applications")
+    op.drop_table("internships")
+    op.drop_table("employer_profiles")
+    op.drop_table("student_profiles")
+    op.drop_table("users")
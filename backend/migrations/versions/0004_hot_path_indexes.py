@@ -0,0 +1,54 @@
+"""composite indexes for the crud hot paths and one application per student
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+DUPLICATES_SQL = (
+    "SELECT internship_id, student_id, COUNT(*) AS applications FROM applications "
+    "GROUP BY internship_id, student_id HAVING COUNT(*) > 1 ORDER BY internship_id, student_id"
+)
+
+def upgrade():
+    # Checked before any DDL (SQLite DDL is not transactional). Duplicates may be
+    # referenced from credit_ledger, so which to keep is left to an operator.
+    duplicates = op.get_bind().execute(sa.text(DUPLICATES_SQL)).fetchall()
+    if duplicates:
+        pairs = ", ".join(f"(internship {row.internship_id}, student {row.student_id})" for row in duplicates[:10])
+        raise RuntimeError(
+            f"{len(duplicates)} internship/student pairs have more than one application, e.g. {pairs}. "
+            "Merge or delete the extra rows (see migrations/README.md), then run the upgrade again."
+        )
+
+    # get_internships(employer_id=...) ordered by (posted_date, id); joins from an employer
+    op.create_index("ix_internships_employer_id_posted_date", "internships", ["employer_id", "posted_date"])
+    # get_internships(active_only=True): newest-first listing of active postings only
+    op.create_index(
+        "ix_internships_active_posted_date", "internships", ["posted_date", "id"],
+        postgresql_where=sa.text("is_active = true"), sqlite_where=sa.text("is_active = 1"),
+    )
+    # get_hired_applications and status filters per internship
+    op.create_index(
+        "ix_applications_internship_id_status_applied_date", "applications",
+        ["internship_id", "status", "applied_date"],
+    )
+    # get_applications_by_student ordered by (applied_date, id)
+    op.create_index("ix_applications_student_id_applied_date", "applications", ["student_id", "applied_date"])
+    with op.batch_alter_table("applications") as batch_op:
+        batch_op.create_unique_constraint("uq_applications_internship_id_student_id", ["internship_id", "student_id"])
+
+def downgrade():
+    with op.batch_alter_table("applications") as batch_op:
+        batch_op.drop_constraint("uq_applications_internship_id_student_id", type_="unique")
+    op.drop_index("ix_applications_student_id_applied_date", table_name="applications")
+    op.drop_index("ix_applications_internship_id_status_applied_date", table_name="applications")
+    op.drop_index("ix_internships_active_posted_date", table_name="internships")
+    op.drop_index("ix_internships_employer_id_posted_date", table_name="internships")
@@ -0,0 +1,25 @@
+"""internships.version and internships.updated_at for HTTP cache validation
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("internships", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    # No server default: SQLite cannot add a column with a non-constant one. The
+    # ORM sets it on insert and update; existing rows take their posting date.
+    op.add_column("internships", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE internships SET updated_at = posted_date")
+
+def downgrade():
+    with op.batch_alter_table("internships") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("version")
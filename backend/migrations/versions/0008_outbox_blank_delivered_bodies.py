@@ -0,0 +1,21 @@
+"""Blank the bodies of delivered and given-up outbox emails
+
+They can hold OTPs and password-reset codes; the dispatcher now blanks them
+when a row is finished, and this clears the rows finished before that.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("UPDATE email_outbox SET body = '' WHERE status IN ('sent', 'failed')")
+
+def downgrade():
+    pass # The bodies are gone for good
@@ -0,0 +1,39 @@
+"""Store SQLite timestamps with microseconds
+
+Rows stamped by the CURRENT_TIMESTAMP server default hold "YYYY-MM-DD HH:MM:SS",
+while SQLAlchemy writes and binds "YYYY-MM-DD HH:MM:SS.ffffff". The models now
+default to the long form (models.utc_now); this pads the rows written before, so
+keyset cursors can compare the raw columns. PostgreSQL stores real timestamps
+and is left alone.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_COLUMNS = [
+    ("users", "created_at"),
+    ("users", "updated_at"),
+    ("users", "last_credit_refill"),
+    ("internships", "posted_date"),
+    ("internships", "updated_at"),
+    ("applications", "applied_date"),
+    ("email_outbox", "next_attempt_at"),
+    ("email_outbox", "created_at"),
+    ("credit_ledger", "created_at"),
+]
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19")
+
+def downgrade():
+    pass # The padded values read back as the same instants
@@ -1,13 +1,41 @@
 # backend/models.py
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime, timedelta
 
+# --- Timestamps ---
+
+class utc_now(FunctionElement):
+    """
+    The current time, stored the way SQLAlchemy stores datetimes it binds. On
+    SQLite, CURRENT_TIMESTAMP gives "YYYY-MM-DD HH:MM:SS" while bound values are
+    "YYYY-MM-DD HH:MM:SS.ffffff"; mixing the two breaks text comparisons such as
+    keyset cursors. Used as the insert/update default of every timestamp column,
+    with server_default=func.now() kept for rows written outside the ORM.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "now()"
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    # %f is seconds with milliseconds; pad to microseconds
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
 class User(Base):
     """
     SQLAlchemy model for the 'users' table.
@@ -25,12 +53,14 @@ class User(Base):
     address = Column(String, nullable=True)
     bio = Column(Text, nullable=True)
     profile_picture_url = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utc_now())
     is_verified = Column(Boolean, default=False)
     credits = Column(Integer, default=5)
     is_premium = Column(Boolean, default=False)
-    last_credit_refill = Column(DateTime(timezone=True), server_default=func.now())
+    last_credit_refill = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
+    # Bumped whenever issued tokens must stop working (password or role change)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationships
     student_profile = relationship("StudentProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -38,6 +68,9 @@ class User(Base):
     internships_posted = relationship("Internship", back_populates="employer", cascade="all, delete-orphan")
     applications = relationship("Application", back_populates="student", cascade="all, delete-orphan")
 
+    # Fetch updated_at (onupdate) through RETURNING instead of expiring it after each UPDATE
+    __mapper_args__ = {"eager_defaults": True}
+
     # ... existing columns
     otp = Column(String, nullable=True)
     otp_expires_at = Column(DateTime(timezone=True), nullable=True)
@@ -92,13 +125,32 @@ class Internship(Base):
     location = Column(String, nullable=True)
     stipend = Column(String, nullable=True) # Can be 'Paid', 'Unpaid', or a specific amount
     duration = Column(String, nullable=True)
-    posted_date = Column(DateTime(timezone=True), server_default=func.now())
+    posted_date = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
     deadline_date = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True)
+    # Validators for HTTP caching: version is bumped by crud.update_internship and
+    # yields the ETag, updated_at the Last-Modified date (NULL for rows bulk-loaded
+    # with COPY, which fall back to posted_date)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utc_now(), onupdate=utc_now())
 
     employer = relationship("User", back_populates="internships_posted")
     applications = relationship("Application", back_populates="internship", cascade="all, delete-orphan")
 
+    # Fetch updated_at through RETURNING instead of expiring it after each write
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Index changes need a migration in migrations/versions
+    __table_args__ = (
+        # Employer listings and joins from an employer to their applications
+        Index("ix_internships_employer_id_posted_date", "employer_id", "posted_date"),
+        # Newest-first listing of active internships only
+        Index(
+            "ix_internships_active_posted_date", "posted_date", "id",
+            postgresql_where=(is_active == True), sqlite_where=(is_active == True),
+        ),
+    )
+
 class Application(Base):
     """
     SQLAlchemy model for the 'applications' table.
@@ -109,7 +161,7 @@ class Application(Base):
     id = Column(Integer, primary_key=True, index=True)
     internship_id = Column(Integer, ForeignKey("internships.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    applied_date = Column(DateTime(timezone=True), server_default=func.now())
+    applied_date = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
     status = Column(String, default="pending") # 'pending', 'reviewed', 'accepted', 'rejected', 'hired'
     cover_letter = Column(Text, nullable=True)
     # Potentially add a field for employer's notes or feedback
@@ -117,3 +169,64 @@ class Application(Base):
     internship = relationship("Internship", back_populates="applications")
     student = relationship("User", back_populates="applications")
 
+    # Index changes need a migration in migrations/versions
+    __table_args__ = (
+        # A student applies to an internship at most once; also serves lookups by internship
+        UniqueConstraint("internship_id", "student_id", name="uq_applications_internship_id_student_id"),
+        # Applicants per internship filtered by status, newest first (e.g. hired interns)
+        Index("ix_applications_internship_id_status_applied_date", "internship_id", "status", "applied_date"),
+        # A student's applications, newest first
+        Index("ix_applications_student_id_applied_date", "student_id", "applied_date"),
+    )
+
+
+class EmailOutbox(Base):
+    """
+    SQLAlchemy model for the 'email_outbox' table.
+    Outgoing emails, written in the same transaction as the change that triggers
+    them and delivered later by the dispatcher in mail.py.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False) # Blanked once sent or given up on: it may hold an OTP
+    subtype = Column(String, default="html", nullable=False)
+    status = Column(String, default="pending", nullable=False, index=True) # 'pending', 'sending', 'sent', 'failed'
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now(), index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+class CreditLedger(Base):
+    """
+    SQLAlchemy model for the 'credit_ledger' table.
+    Append-only record of every change to a user's credits, written in the same
+    transaction as the change itself.
+    """
+    __tablename__ = "credit_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False) # 'apply', 'hired', 'top_up', 'refill'
+    application_id = Column(Integer, ForeignKey("applications.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utc_now(), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_credit_ledger_user_id_created_at", "user_id", "created_at"),
+    )
+
+class RateLimitBucket(Base):
+    """
+    SQLAlchemy model for the 'rate_limit_buckets' table.
+    Token buckets shared by every worker when RATE_LIMIT_BACKEND=database.
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True) # e.g. 'login:ip:203.0.113.7'
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False) # Unix time of the last refill
@@ -0,0 +1,60 @@
+# backend/pagination.py
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, tuple_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that was not issued by this API."""
+
+def encode_cursor(values) -> str:
+    """Packs the sort key of a row into an opaque, URL-safe cursor string."""
+    raw = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns):
+    """Unpacks a cursor back into values typed like the given sort columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        values = []
+        for column, value in zip(columns, raw):
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, (int, str)):
+                raise ValueError("unexpected cursor value")
+            values.append(value)
+        return values
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+def paginate(query, model, key, skip: int = 0, limit: int = 100, cursor: str = None, descending: bool = True):
+    """
+    Orders `query` by the `key` attributes of `model` and returns one page of results.
+    With a cursor the page starts right after the row the cursor was built from
+    (keyset pagination); otherwise `skip` is applied as a plain OFFSET.
+    """
+    columns = [getattr(model, attribute) for attribute in key]
+    if cursor:
+        sort_key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(sort_key < values if descending else sort_key > values)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    query = query.order_by(*order)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def next_cursor(items, limit: int, key):
+    """Cursor for the page after `items`, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, attribute) for attribute in key])
@@ -0,0 +1,120 @@
+# backend/query_stats.py
+
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Debug mode: report each request's query count and DB time in the X-DB-Queries
+# and Server-Timing response headers.
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "False").lower() in ("true", "1", "t")
+# Test mode: fail any request that runs the same statement shape more than this
+# many times, the signature of an N+1 loop. 0 turns the detector off.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 0))
+
+QUERIES_HEADER = "X-DB-Queries"
+
+class NPlusOneDetected(AssertionError):
+    """Raised in test mode when a request repeats one statement shape too often."""
+
+class RequestQueryStats:
+    """Queries run on behalf of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """(shape, count) pairs for statements run more than `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+# Bound parameters are already placeholders, so only whitespace and the number of
+# expanded IN (...) parameters vary between runs of the same statement
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \([^()]*\)")
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+# Set for the duration of a request by QueryStatsMiddleware. Threadpool calls and
+# AsyncSession.run_sync copy the context, so queries they run are still counted.
+current_stats: ContextVar = ContextVar("current_query_stats", default=None)
+
+# --- Engine hooks ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+def instrument(engine):
+    """Counts the queries `engine` (a sync Engine, or an AsyncEngine's sync_engine) runs per request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+# --- Middleware ---
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that collects RequestQueryStats for each HTTP request. With
+    `report_headers` the totals are added to the response headers; with a
+    `threshold` above 0 a repeated statement raises NPlusOneDetected before the
+    response starts. Only installed when one of the two is wanted.
+    """
+
+    def __init__(self, app, report_headers: bool = QUERY_STATS_ENABLED, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.report_headers = report_headers
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestQueryStats()
+        token = current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                if self.threshold:
+                    repeated = stats.repeated(self.threshold)
+                    if repeated:
+                        shape, count = repeated[0]
+                        raise NPlusOneDetected(
+                            f"{scope['method']} {scope['path']} ran one statement {count} times "
+                            f"(threshold {self.threshold}): {shape}"
+                        )
+                if self.report_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERIES_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'.encode(),
+                    ))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_stats.reset(token)
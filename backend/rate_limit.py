@@ -0,0 +1,168 @@
+# backend/rate_limit.py
+
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+import crud, metrics
+from database import SessionLocal
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "t")
+# "memory" keeps buckets per worker process; "database" shares them between
+# workers and hosts through the rate_limit_buckets table.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# Only behind a proxy that sets it: otherwise clients could pick their own IP
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False").lower() in ("true", "1", "t")
+# Largest request body read to find the email; bigger bodies are only keyed by IP
+RATE_LIMIT_MAX_BODY_BYTES = 16 * 1024
+
+# Per-route budgets as [capacity, period in seconds]: a bucket holds `capacity`
+# tokens and refills completely over `period`. Each route is limited per client IP
+# and per submitted email. Override with RATE_LIMIT_RULES, JSON in the same shape.
+DEFAULT_RULES = {
+    "/login": {"ip": [20, 60], "email": [5, 60]},
+    "/request-register-otp": {"ip": [5, 300], "email": [3, 600]},
+    "/forgot-password": {"ip": [5, 300], "email": [3, 600]},
+    "/reset-password": {"ip": [10, 300], "email": [5, 600]},
+    "/verify-and-register": {"ip": [10, 300], "email": [5, 600]},
+}
+RULES = json.loads(os.getenv("RATE_LIMIT_RULES", "null")) or DEFAULT_RULES
+
+# --- Backends ---
+
+class MemoryBackend:
+    """Token buckets in this process, evicting the least recently used past max_keys."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Returns 0 if a token was taken, otherwise the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+class DatabaseBackend:
+    """Token buckets in the rate_limit_buckets table, shared by every worker."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._takes = 0
+        self._idle_seconds = max(period for rule in RULES.values() for _, period in rule.values())
+
+    def _take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        db = SessionLocal()
+        try:
+            now = time.time()
+            self._takes += 1
+            if self._takes % self.PRUNE_EVERY == 0:
+                crud.prune_rate_limit_buckets(db, idle_before=now - self._idle_seconds)
+            return crud.take_rate_limit_token(db, key, capacity, refill_per_second, now)
+        finally:
+            db.close()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        return await run_in_threadpool(self._take, key, capacity, refill_per_second)
+
+def make_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "database":
+        return DatabaseBackend()
+    return MemoryBackend()
+
+# --- Middleware ---
+
+def _client_ip(scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+def _email_from_body(body: bytes, content_type: str):
+    try:
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            values = parse_qs(body.decode())
+            email = (values.get("email") or values.get("username") or [None])[0]
+        else:
+            data = json.loads(body)
+            email = data.get("email") if isinstance(data, dict) else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying RULES to POST requests on the listed paths. It reads
+    the (small) body to key by email, then replays it to the app. A request over
+    budget gets a 429 with Retry-After before any route code runs, so it never
+    reaches bcrypt, SMTP or the database writes behind these endpoints.
+    """
+
+    def __init__(self, app, rules: dict = None, backend=None):
+        self.app = app
+        self.rules = RULES if rules is None else rules
+        self.backend = backend or make_backend()
+
+    async def __call__(self, scope, receive, send):
+        rule = self.rules.get(scope.get("path")) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        # Buffer the body so the email can be read, then hand it to the app unchanged
+        messages, size = [], 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            size += len(message.get("body", b""))
+            if message["type"] != "http.request" or not message.get("more_body") or size > RATE_LIMIT_MAX_BODY_BYTES:
+                break
+
+        keys = [("ip", _client_ip(scope))]
+        if "email" in rule and size <= RATE_LIMIT_MAX_BODY_BYTES:
+            content_type = dict(scope.get("headers", [])).get(b"content-type", b"").decode("latin-1").lower()
+            email = _email_from_body(b"".join(m.get("body", b"") for m in messages), content_type)
+            if email:
+                keys.append(("email", email))
+
+        for kind, value in keys:
+            if kind not in rule:
+                continue
+            capacity, period = rule[kind]
+            retry_after = await self.backend.take(f"{scope['path']}:{kind}:{value}", capacity, capacity / period)
+            if retry_after:
+                metrics.RATE_LIMITED.labels(scope["path"], kind).inc()
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests, please retry later"},
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                return await response(scope, receive, send)
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        await self.app(scope, replay, send)
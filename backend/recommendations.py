@@ -0,0 +1,296 @@
+# backend/recommendations.py
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+
+# How often a worker re-reads internships changed since its last look, picking up
+# writes made by other workers and by bulk imports
+RECOMMENDATIONS_REFRESH_SECONDS = float(os.getenv("RECOMMENDATIONS_REFRESH_SECONDS", 30))
+# Rows stamped this long before the last refresh are read again, so a transaction
+# that committed late with an older timestamp is not missed
+REFRESH_OVERLAP = timedelta(seconds=60)
+# Updated postings are scored from a small side matrix until it reaches this many
+# rows (or a twentieth of the main matrix), then everything is rebuilt with fresh IDF
+COMPACT_MIN_ROWS = 256
+
+# Title terms count this many times, so "Data Analyst Intern" outranks a posting
+# that merely mentions data once in its description
+TITLE_WEIGHT = 2
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the this to we will with you your "
+    "intern internship internships work working team role".split()
+)
+# Keeps tokens like c++, c#, node.js and .net whole
+_TOKEN = re.compile(r"[a-z0-9.+#]*[a-z0-9+#]")
+
+def tokenize(text: str):
+    if not text:
+        return []
+    return [token.lstrip(".") for token in _TOKEN.findall(text.lower()) if token.lstrip(".") not in STOP_WORDS]
+
+def profile_text(value: str) -> str:
+    """StudentProfile.skills/experience as plain text; they may hold JSON or a comma-separated list."""
+    if not value:
+        return ""
+    try:
+        data = json.loads(value)
+    except ValueError:
+        return value
+    strings = []
+    def walk(node):
+        if isinstance(node, str):
+            strings.append(node)
+        elif isinstance(node, dict):
+            for child in node.values():
+                walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+    walk(data)
+    return " ".join(strings)
+
+def _term_counts(title: str, description: str, requirements: str) -> dict:
+    counts = {}
+    for token in tokenize(title):
+        counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+    for token in tokenize(description) + tokenize(requirements):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+def _internship_counts(title: str, description: str, requirements: str, is_active) -> dict:
+    # Inactive postings are indexed as empty, which removes them
+    return _term_counts(title, description, requirements) if is_active is not False else {}
+
+class SkillIndex:
+    """
+    TF-IDF vectors (sublinear TF, smoothed IDF, L2-normalised) of active internships.
+
+    The main matrix is stored column-major, so a query only touches the postings of
+    its own terms. create/update/delete in crud call upsert/remove, which tombstone
+    the old row and score the new one from a small side matrix using the current
+    IDF; compaction folds the side matrix back in. One index per worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._vocab = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        self._docs = {} # internship id -> (term columns, sublinear tf), both arrays
+        self._rows = {} # internship id -> ("main" | "side", row)
+        self._main = sparse.csc_matrix((0, 0))
+        self._main_ids = np.zeros(0, dtype=np.int64)
+        self._main_live = np.zeros(0, dtype=bool)
+        self._side_rows = [] # (internship id, columns, weights), weights already normalised
+        self._side_live = []
+        self._side_matrix = None
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._refreshing = False
+
+    # --- Vectors ---
+
+    def _columns(self, terms, grow: bool):
+        columns = []
+        for term in terms:
+            column = self._vocab.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = self._vocab[term] = len(self._vocab)
+                if column >= len(self._df):
+                    self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int64)])
+            columns.append(column)
+        return columns
+
+    def _idf(self, columns):
+        n = len(self._docs)
+        return np.log((1 + n) / (1 + self._df[columns])) + 1
+
+    def _add_doc(self, internship_id: int, counts: dict):
+        columns = np.array(self._columns(counts, grow=True), dtype=np.int64)
+        tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        self._docs[internship_id] = (columns, tf)
+        self._df[columns] += 1
+        return columns, tf
+
+    def _drop_doc(self, internship_id: int):
+        doc = self._docs.pop(internship_id, None)
+        if doc is None:
+            return
+        self._df[doc[0]] -= 1
+        where, row = self._rows.pop(internship_id)
+        if where == "main":
+            self._main_live[row] = False
+        else:
+            self._side_live[row] = False
+            self._side_matrix = None
+
+    def _compact(self):
+        """Rebuilds the main matrix from every live document with the current IDF."""
+        ids = np.fromiter(self._docs, dtype=np.int64, count=len(self._docs))
+        lengths = np.array([len(self._docs[i][0]) for i in ids.tolist()], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        if len(ids):
+            indices = np.concatenate([self._docs[i][0] for i in ids.tolist()])
+            data = np.concatenate([self._docs[i][1] for i in ids.tolist()])
+        else:
+            indices, data = np.zeros(0, dtype=np.int64), np.zeros(0)
+        data = data * self._idf(indices)
+        norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1])) if len(data) else np.zeros(0)
+        data = data / np.repeat(np.where(norms > 0, norms, 1), lengths)
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(ids), len(self._vocab)))
+        self._main = matrix.tocsc()
+        self._main_ids = ids
+        self._main_live = np.ones(len(ids), dtype=bool)
+        self._rows = {internship_id: ("main", row) for row, internship_id in enumerate(ids.tolist())}
+        self._side_rows, self._side_live, self._side_matrix = [], [], None
+
+    def _side(self):
+        """The side rows as a CSR matrix over the current vocabulary, built on demand."""
+        if self._side_matrix is None:
+            live = [(row, entry) for row, entry in enumerate(self._side_rows) if self._side_live[row]]
+            indptr = np.concatenate([[0], np.cumsum([len(entry[1]) for _, entry in live])]).astype(np.int64)
+            indices = np.concatenate([entry[1] for _, entry in live]) if live else np.zeros(0, dtype=np.int64)
+            data = np.concatenate([entry[2] for _, entry in live]) if live else np.zeros(0)
+            self._side_matrix = (
+                np.array([entry[0] for _, entry in live], dtype=np.int64),
+                sparse.csr_matrix((data, indices, indptr), shape=(len(live), len(self._vocab))),
+            )
+        return self._side_matrix
+
+    # --- Updates ---
+
+    def _upsert(self, internship_id: int, counts: dict):
+        """Replaces one document's terms; empty `counts` (inactive or no text) drops it."""
+        existing = self._docs.get(internship_id)
+        if existing is not None and counts:
+            columns = self._columns(counts, grow=False)
+            if len(columns) == len(counts) and np.array_equal(existing[0], columns) and np.allclose(
+                existing[1], 1 + np.log(list(counts.values()))
+            ):
+                return # Unchanged text, e.g. a status-only edit seen again by a refresh
+        self._drop_doc(internship_id)
+        if not counts:
+            return
+        columns, tf = self._add_doc(internship_id, counts)
+        weights = tf * self._idf(columns)
+        weights /= np.linalg.norm(weights) or 1
+        self._rows[internship_id] = ("side", len(self._side_rows))
+        self._side_rows.append((internship_id, columns, weights))
+        self._side_live.append(True)
+        self._side_matrix = None
+        if len(self._side_rows) > max(COMPACT_MIN_ROWS, len(self._main_ids) // 20):
+            self._compact()
+
+    def upsert(self, internship: models.Internship):
+        """Re-indexes one internship after a write; inactive ones are dropped. No-op until loaded."""
+        if not self.loaded:
+            return
+        counts = _internship_counts(internship.title, internship.description, internship.requirements, internship.is_active)
+        with self._lock:
+            self._upsert(internship.id, counts)
+
+    def remove(self, internship_id: int):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._drop_doc(internship_id)
+
+    # --- Loading ---
+
+    def _changed_since(self, db: Session, since):
+        stamp = func.coalesce(models.Internship.updated_at, models.Internship.posted_date)
+        watermark = db.execute(select(func.max(stamp))).scalar()
+        query = select(
+            models.Internship.id, models.Internship.title, models.Internship.description,
+            models.Internship.requirements, models.Internship.is_active,
+        )
+        if since is None:
+            query = query.where(models.Internship.is_active == True)
+        else:
+            query = query.where(stamp >= since)
+        return watermark, db.execute(query.execution_options(yield_per=2000))
+
+    def refresh(self, db: Session):
+        """
+        Loads the index on first use, then picks up changed rows every
+        RECOMMENDATIONS_REFRESH_SECONDS. The queries run without the lock: in async
+        mode run_sync yields to the event loop mid-query, and another request on that
+        loop must never block on a lock held across it. A caller arriving while a
+        refresh is running skips it and uses the index as it stands (empty until the
+        first load completes).
+        """
+        with self._lock:
+            if self._refreshing or (self.loaded and time.monotonic() - self._refreshed_at < RECOMMENDATIONS_REFRESH_SECONDS):
+                return
+            self._refreshing = True
+            first_load = not self.loaded or self._watermark is None
+            since = None if first_load else self._watermark - REFRESH_OVERLAP
+        try:
+            watermark, rows = self._changed_since(db, since)
+            documents = [
+                (row.id, _internship_counts(row.title, row.description, row.requirements, row.is_active)) for row in rows
+            ]
+            with self._lock:
+                if first_load:
+                    for internship_id, counts in documents:
+                        if counts and internship_id not in self._docs:
+                            self._add_doc(internship_id, counts)
+                    self._compact()
+                else:
+                    for internship_id, counts in documents:
+                        self._upsert(internship_id, counts)
+                self._watermark = watermark if watermark is not None else self._watermark
+                self._refreshed_at = time.monotonic()
+                self.loaded = True
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    # --- Queries ---
+
+    def top_k(self, text: str, k: int, exclude=()):
+        """[(internship id, cosine score)] for the k best matches of `text`, best first."""
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        with self._lock:
+            known = [(self._vocab[term], count) for term, count in counts.items() if term in self._vocab]
+            if not known or not self._docs:
+                return []
+            columns = np.array([column for column, _ in known], dtype=np.int64)
+            weights = (1 + np.log([count for _, count in known])) * self._idf(columns)
+            weights /= np.linalg.norm(weights)
+
+            # Column slices of the CSC main matrix: cost scales with the query's postings
+            main_columns = columns < self._main.shape[1]
+            main_scores = self._main[:, columns[main_columns]] @ weights[main_columns]
+            main_scores = np.where(self._main_live, main_scores, 0.0)
+            side_ids, side_matrix = self._side()
+            side_scores = side_matrix[:, columns] @ weights if side_matrix.shape[0] else np.zeros(0)
+
+            ids = np.concatenate([self._main_ids, side_ids])
+            scores = np.concatenate([np.asarray(main_scores).ravel(), np.asarray(side_scores).ravel()])
+        if len(exclude):
+            scores[np.isin(ids, np.fromiter(exclude, dtype=np.int64))] = 0.0
+        k = min(k, int(np.count_nonzero(scores > 0)))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in best]
+
+index = SkillIndex()
@@ -0,0 +1,163 @@
+# backend/replicas.py
+
+import os
+import threading
+import time
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.concurrency import run_in_threadpool
+
+import auth
+from database import (
+    DB_MODE, AsyncSessionLocal, SessionLocal, async_database_url, engine_options,
+)
+
+# Comma-separated read replica URLs, in the same form as DATABASE_URL. Unset means
+# every read goes to the primary. Two SQLite files work for local testing.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# After a user's write, their reads stay on the primary this long so they see it
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+# A replica that failed to connect is skipped this long before being tried again
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+
+# Set on write responses so a browser's next read is pinned whichever worker serves it
+PIN_COOKIE = "primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+class ReplicaRouter:
+    """
+    Round-robin choice among replica engines, skipping ones that recently failed,
+    plus per-user primary pins for read-your-writes. Pins are per process; the
+    PIN_COOKIE carries them across workers for browser clients.
+    """
+
+    def __init__(self, engines):
+        self.engines = engines
+        self._down_until = [0.0] * len(engines)
+        self._next = 0
+        self._pins = {}
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """Index of the next healthy replica, or None if all are down."""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = self._next
+                self._next = (self._next + 1) % len(self.engines)
+                if self._down_until[index] <= now:
+                    return index
+        return None
+
+    def mark_down(self, index: int):
+        with self._lock:
+            self._down_until[index] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    def pin(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._pins) > 10000:
+                self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+            self._pins[user_id] = now + READ_YOUR_WRITES_SECONDS
+
+    def is_pinned(self, user_id: int) -> bool:
+        until = self._pins.get(user_id)
+        return until is not None and until > time.monotonic()
+
+def _build_router():
+    if not DATABASE_REPLICA_URLS:
+        return None
+    if DB_MODE == "async":
+        urls = [async_database_url(url) for url in DATABASE_REPLICA_URLS]
+        return ReplicaRouter([create_async_engine(url, **engine_options(url)) for url in urls])
+    return ReplicaRouter([create_engine(url, **engine_options(url)) for url in DATABASE_REPLICA_URLS])
+
+router = _build_router()
+
+def caller_id(request: Request):
+    """The user id in the request's bearer token, or None for anonymous or invalid tokens."""
+    authorization = request.headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.decode(authorization[7:], auth.SECRET_KEY, algorithms=[auth.ALGORITHM]).get("id")
+    except JWTError:
+        return None
+
+def _wants_primary(request: Request) -> bool:
+    if router is None:
+        return True
+    if request.cookies.get(PIN_COOKIE):
+        return True
+    user_id = caller_id(request)
+    return user_id is not None and router.is_pinned(user_id)
+
+async def get_read_db(request: Request):
+    """
+    Session dependency for read-only routes. Uses the next healthy replica, or the
+    primary when no replicas are configured, when the caller wrote recently, or
+    when the replica cannot be reached (it is then skipped for a while).
+    """
+    index = None if _wants_primary(request) else router.pick()
+    connection = None
+    if index is not None:
+        # Connect up front so an unreachable replica falls back to the primary
+        # instead of failing the request on its first query
+        replica = router.engines[index]
+        try:
+            if DB_MODE == "async":
+                connection = await replica.connect()
+            else:
+                connection = await run_in_threadpool(replica.connect)
+        except Exception:
+            router.mark_down(index)
+
+    if DB_MODE == "async":
+        db = AsyncSessionLocal(bind=connection) if connection is not None else AsyncSessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+            if connection is not None:
+                await connection.close()
+        return
+
+    db = SessionLocal(bind=connection) if connection is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+        if connection is not None:
+            await run_in_threadpool(connection.close)
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a user's reads to the primary for READ_YOUR_WRITES_SECONDS after any of
+    their requests with an unsafe method succeeds. Installed only with replicas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        request = Request(scope)
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = caller_id(request)
+                if user_id is not None:
+                    router.pin(user_id)
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"set-cookie",
+                    f"{PIN_COOKIE}=1; Max-Age={int(READ_YOUR_WRITES_SECONDS) or 1}; Path=/; HttpOnly; SameSite=Lax".encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
@@ -0,0 +1,475 @@
+# backend/resume_render.py
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import weasyprint
+from jinja2 import Template
+from weasyprint.text.fonts import FontConfiguration
+
+import metrics, schemas
+from executors import BoundedExecutor
+
+# Rendering runs in worker processes so WeasyPrint layout never blocks the event loop
+RESUME_RENDER_WORKERS = int(os.getenv("RESUME_RENDER_WORKERS", 2))
+RESUME_RENDER_QUEUE_DEPTH = int(os.getenv("RESUME_RENDER_QUEUE_DEPTH", 8))
+# Total size of PDFs kept in the in-process result cache
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Fonts ship with the backend (see fonts/README.md); other remote assets such as
+# images are only served if a copy was placed in RESUME_ASSET_CACHE_DIR, named by
+# the SHA-256 of their URL. Renders never go to the network.
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+FONTS_DIR = os.path.join(BACKEND_DIR, "fonts")
+RESUME_ASSET_CACHE_DIR = os.getenv("RESUME_ASSET_CACHE_DIR", os.path.join(BACKEND_DIR, "asset_cache"))
+ASSET_SCHEME = "resume-asset:"
+
+MANROPE_WEIGHTS = {
+    300: "Manrope-Light.ttf",
+    400: "Manrope-Regular.ttf",
+    500: "Manrope-Medium.ttf",
+    600: "Manrope-SemiBold.ttf",
+    700: "Manrope-Bold.ttf",
+}
+
+def _font_face_css() -> str:
+    """@font-face rules for the bundled Manrope files that are present on disk."""
+    rules = []
+    for weight, filename in sorted(MANROPE_WEIGHTS.items()):
+        if os.path.exists(os.path.join(FONTS_DIR, filename)):
+            rules.append(
+                "@font-face { font-family: 'Manrope'; font-style: normal; "
+                f"font-weight: {weight}; src: url('{ASSET_SCHEME}fonts/{filename}'); }}"
+            )
+    return "\n".join(rules)
+
+FONT_FACE_CSS = _font_face_css()
+
+# --- Offline URL fetcher ---
+
+_asset_cache = {}
+_asset_lock = threading.Lock()
+
+def _read_asset(url: str):
+    if url.startswith(ASSET_SCHEME):
+        relative = url[len(ASSET_SCHEME):].lstrip("/")
+        base = os.path.realpath(BACKEND_DIR)
+        path = os.path.realpath(os.path.join(base, relative))
+        if not path.startswith(base + os.sep):
+            raise ValueError(f"Asset path escapes the backend directory: {url}")
+    else:
+        path = os.path.join(RESUME_ASSET_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest())
+    if not os.path.exists(path):
+        raise ValueError(f"Asset not available offline: {url}")
+    with open(path, "rb") as f:
+        return f.read()
+
+def fetch_asset(url: str, timeout=10, ssl_context=None):
+    """
+    WeasyPrint url_fetcher that never touches the network.
+    Bundled assets and cached remote assets are read from disk once per process
+    and then served from memory; anything else is refused.
+    """
+    if url.startswith("data:"):
+        return weasyprint.default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+    with _asset_lock:
+        content = _asset_cache.get(url)
+    if content is None:
+        content = _read_asset(url)
+        with _asset_lock:
+            _asset_cache[url] = content
+    return {"string": content, "redirected_url": url}
+
+# --- Resume HTML Template ---
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ personal_info.fullName }} - Resume</title>
+    <style>
+        body {
+            font-family: 'Manrope', 'Segoe UI', Arial, sans-serif;
+            background: #f8fafc;
+            color: #22223b;
+            font-size: 11pt;
+            margin: 0;
+        }
+        .container {
+            max-width: 820px;
+            margin: 40px auto;
+            background: #fff;
+            border-radius: 18px;
+            box-shadow: 0 4px 32px rgba(30,64,175,0.08), 0 1.5px 6px rgba(0,0,0,0.04);
+            padding: 48px 56px;
+        }
+        .header {
+            text-align: left;
+            border-bottom: 2.5px solid #2563eb;
+            padding-bottom: 18px;
+            margin-bottom: 32px;
+            display: flex;
+            flex-direction: column;
+            gap: 8px;
+        }
+        .name {
+            font-size: 28pt;
+            font-weight: 700;
+            color: #2563eb;
+            letter-spacing: 1px;
+        }
+        .contact-info {
+            font-size: 10.5pt;
+            color: #4b5563;
+            display: flex;
+            gap: 18px;
+            flex-wrap: wrap;
+        }
+        .contact-info a {
+            color: #2563eb;
+            text-decoration: underline;
+        }
+        .section {
+            margin-bottom: 32px;
+        }
+        .section-title {
+            font-size: 15pt;
+            font-weight: 700;
+            color: #22223b;
+            margin-bottom: 14px;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+            border-bottom: 1.5px solid #e5e7eb;
+            padding-bottom: 6px;
+        }
+        .objective {
+            font-size: 11.5pt;
+            line-height: 1.7;
+            text-align: justify;
+            margin-bottom: 18px;
+            color: #3a3a3a;
+        }
+        .education-item {
+            margin-bottom: 12px;
+        }
+        .degree {
+            font-weight: 700;
+            font-size: 13pt;
+            color: #2563eb;
+        }
+        .college {
+            font-weight: 500;
+            color: #374151;
+            margin-bottom: 2px;
+        }
+        .education-details {
+            font-size: 10.5pt;
+            color: #6b7280;
+        }
+        .project-item, .experience-item, .certification-item {
+            margin-bottom: 18px;
+            padding: 16px 0 0 0;
+            border-top: 1px solid #e5e7eb;
+        }
+        .project-title, .role {
+            font-weight: 700;
+            font-size: 12.5pt;
+            color: #2563eb;
+        }
+        .company, .project-meta {
+            font-weight: 500;
+            color: #374151;
+            font-size: 10.5pt;
+            margin-bottom: 4px;
+        }
+        .tech-stack {
+            margin: 8px 0;
+        }
+        .tech-item {
+            display: inline-block;
+            background: #e0e7ff;
+            color: #2563eb;
+            padding: 3px 10px;
+            border-radius: 14px;
+            font-size: 9.5pt;
+            margin-right: 7px;
+            margin-bottom: 4px;
+        }
+        .responsibilities {
+            list-style: none;
+            padding-left: 0;
+            margin-top: 8px;
+        }
+        .responsibilities li {
+            margin-bottom: 6px;
+            padding-left: 18px;
+            position: relative;
+            font-size: 10.5pt;
+        }
+        .responsibilities li:before {
+            content: "•";
+            color: #2563eb;
+            font-weight: bold;
+            position: absolute;
+            left: 0;
+        }
+        .skills-list {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+        }
+        .skill-item {
+            background: #f3f4f6;
+            color: #2563eb;
+            padding: 5px 14px;
+            border-radius: 16px;
+            font-size: 10.5pt;
+            font-weight: 600;
+            box-shadow: 0 1px 4px rgba(37,99,235,0.07);
+        }
+        .certification-name {
+            font-weight: 700;
+            color: #2563eb;
+            font-size: 11.5pt;
+        }
+        .certification-details {
+            color: #374151;
+            font-size: 10.5pt;
+        }
+        .github-link {
+            color: #2563eb;
+            font-size: 10pt;
+            text-decoration: underline;
+        }
+        .date-range {
+            color: #6b7280;
+            font-size: 10.5pt;
+            float: right;
+        }
+        @media print {
+            .container {
+                padding: 20px;
+            }
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <span class="name">{{ personal_info.fullName }}</span>
+            <div class="contact-info">
+                <span>{{ personal_info.email }}</span>
+                <span>{{ personal_info.phone }}</span>
+                {% if personal_info.githubLink %}
+                <a href="{{ personal_info.githubLink }}">GitHub</a>
+                {% endif %}
+                {% if personal_info.linkedinProfile %}
+                <a href="{{ personal_info.linkedinProfile }}">LinkedIn</a>
+                {% endif %}
+            </div>
+        </div>
+
+        {% if objective %}
+        <div class="section">
+            <div class="section-title">Career Objective</div>
+            <p class="objective">{{ objective }}</p>
+        </div>
+        {% endif %}
+
+        <div class="section">
+            <div class="section-title">Education</div>
+            <div class="education-item">
+                <div class="degree">{{ education.degree }}</div>
+                <div class="college">{{ education.college }}</div>
+                <div class="education-details">
+                    CGPA: {{ education.cgpa }} | {{ education.startDate }} - {{ education.endDate }}
+                </div>
+            </div>
+        </div>
+
+        {% if projects %}
+        <div class="section">
+            <div class="section-title">Projects</div>
+            {% for project in projects %}
+            <div class="project-item">
+                <div style="display: flex; justify-content: space-between; align-items: baseline;">
+                    <div class="project-title">{{ project.title }}</div>
+                    {% if project.githubLink %}
+                    <a href="{{ project.githubLink }}" class="github-link">GitHub</a>
+                    {% endif %}
+                </div>
+                <p style="margin: 8px 0; line-height: 1.6;">{{ project.description }}</p>
+                {% if project.techStack %}
+                <div class="tech-stack">
+                    {% for tech in project.techStack %}
+                    <span class="tech-item">{{ tech }}</span>
+                    {% endfor %}
+                </div>
+                {% endif %}
+            </div>
+            {% endfor %}
+        </div>
+        {% endif %}
+
+        {% if experience %}
+        <div class="section">
+            <div class="section-title">Experience</div>
+            {% for exp in experience %}
+            <div class="experience-item">
+                <div style="display: flex; justify-content: space-between; align-items: baseline;">
+                    <div>
+                        <div class="role">{{ exp.role }}</div>
+                        <div class="company">{{ exp.company }}</div>
+                    </div>
+                    <div class="date-range">{{ exp.startDate }} - {{ exp.endDate }}</div>
+                </div>
+                {% if exp.responsibilities %}
+                <ul class="responsibilities">
+                    {% for responsibility in exp.responsibilities %}
+                    <li>{{ responsibility }}</li>
+                    {% endfor %}
+                </ul>
+                {% endif %}
+            </div>
+            {% endfor %}
+        </div>
+        {% endif %}
+
+        {% if skills %}
+        <div class="section">
+            <div class="section-title">Technical Skills</div>
+            <div class="skills-list">
+                {% for skill in skills %}
+                <span class="skill-item">{{ skill }}</span>
+                {% endfor %}
+            </div>
+        </div>
+        {% endif %}
+
+        {% if certifications %}
+        <div class="section">
+            <div class="section-title">Certifications</div>
+            {% for cert in certifications %}
+            <div class="certification-item">
+                <div class="certification-name">{{ cert.name }}</div>
+                <div class="certification-details">{{ cert.institution }} | {{ cert.year }}</div>
+            </div>
+            {% endfor %}
+        </div>
+        {% endif %}
+    </div>
+</body>
+</html>
+"""
+
+# Built once per worker process by the pool initializer: the compiled template,
+# and a font configuration with the bundled fonts already registered
+_template = None
+_font_config = None
+_font_stylesheet = None
+
+def _init_worker():
+    global _template, _font_config, _font_stylesheet
+    _template = Template(HTML_TEMPLATE)
+    _font_config = FontConfiguration()
+    _font_stylesheet = weasyprint.CSS(string=FONT_FACE_CSS, font_config=_font_config, url_fetcher=fetch_asset)
+
+def render_pdf(data: dict) -> bytes:
+    """Renders a resume, given as a ResumeData dict, to PDF bytes. Runs inside a worker."""
+    if _template is None:
+        _init_worker()
+    html_content = _template.render(
+        personal_info=data["personalInfo"],
+        objective=data["objective"],
+        education=data["education"][0] if data["education"] else None,
+        projects=data["projects"],
+        experience=data["experience"],
+        skills=data["skills"],
+        certifications=data["certifications"]
+    )
+    pdf_buffer = io.BytesIO()
+    weasyprint.HTML(string=html_content, url_fetcher=fetch_asset).write_pdf(
+        pdf_buffer, stylesheets=[_font_stylesheet], font_config=_font_config
+    )
+    return pdf_buffer.getvalue()
+
+render_pool = BoundedExecutor(
+    "resume-render", RESUME_RENDER_WORKERS, RESUME_RENDER_QUEUE_DEPTH, kind="process", initializer=_init_worker
+)
+
+# --- Result cache ---
+
+# Part of every cache key, so editing the template or fonts invalidates old renders
+TEMPLATE_DIGEST = hashlib.sha256((HTML_TEMPLATE + FONT_FACE_CSS).encode()).hexdigest()
+
+def cache_key(resume_data: schemas.ResumeData) -> str:
+    """Content address of a resume: a hash of its normalized data and the template."""
+    normalized = json.dumps(resume_data.model_dump(), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{TEMPLATE_DIGEST}:{normalized}".encode()).hexdigest()
+
+class PdfCache:
+    """LRU cache of rendered PDFs bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+    def put(self, key: str, pdf: bytes):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = pdf
+            self.size += len(pdf)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+pdf_cache = PdfCache(RESUME_CACHE_MAX_BYTES)
+
+# Renders in progress, so identical concurrent requests share one render
+_inflight = {}
+
+async def render(resume_data: schemas.ResumeData) -> bytes:
+    """
+    Returns the PDF for a resume, from the cache or rendered on the worker pool.
+    Raises executors.PoolSaturated when the render queue is full.
+    """
+    key = cache_key(resume_data)
+    pdf = pdf_cache.get(key)
+    if pdf is not None:
+        metrics.RESUME_CACHE.labels("hit").inc()
+        return pdf
+
+    task = _inflight.get(key)
+    if task is None:
+        metrics.RESUME_CACHE.labels("rendered").inc()
+        task = asyncio.ensure_future(render_pool.run(render_pdf, resume_data.model_dump()))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        metrics.RESUME_CACHE.labels("shared").inc()
+    pdf = await asyncio.shield(task)
+    pdf_cache.put(key, pdf)
+    return pdf
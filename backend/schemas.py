@@ -1,10 +1,10 @@
 # backend/schemas.py
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 # --- User Schemas ---
@@ -190,10 +190,45 @@ class InternshipResponse(InternshipBase):
     id: int
     employer_id: int
     posted_date: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class InternshipSearchResponse(InternshipResponse):
+    """Internship listing entry, with relevance and a highlighted excerpt when searching."""
+    search_rank: Optional[float] = None
+    snippet: Optional[str] = None
+
+class FacetCount(BaseModel):
+    """Number of internships with one value of a facet; value is null when unset."""
+    value: Optional[str] = None
+    count: int
+
+class InternshipFacets(BaseModel):
+    """Counts next to internship search results, for the listing's filter UI."""
+    total: int
+    location: List[FacetCount]
+    stipend: List[FacetCount]
+    duration: List[FacetCount]
+    status: List[FacetCount] # 'active' or 'expired'
+
+class RecommendedInternship(InternshipResponse):
+    """Internship recommended to a student, with its skill-match score (cosine similarity, 0-1)."""
+    match_score: float
+
+class BulkImportError(BaseModel):
+    """A rejected row of a bulk internship import."""
+    line: int
+    errors: List[str]
+
+class BulkImportReport(BaseModel):
+    """Outcome of a bulk internship import."""
+    imported: int = 0
+    failed: int = 0
+    errors: List[BulkImportError] = []
+    errors_truncated: bool = False # True when more rows failed than are listed
+
 # --- Application Schemas ---
 
 class ApplicationBase(BaseModel):
@@ -219,6 +254,23 @@ class ApplicationResponse(ApplicationBase):
     class Config:
         from_attributes = True
 
+class DashboardInternship(BaseModel):
+    """One internship on the employer dashboard with its application counts."""
+    internship_id: int
+    title: str
+    is_active: Optional[bool] = None
+    posted_date: Optional[datetime] = None
+    application_counts: Dict[str, int] # by application status
+    total_applications: int
+    hired: int
+    latest_application_at: Optional[datetime] = None
+
+class EmployerDashboard(BaseModel):
+    """Application counts across all of an employer's internships."""
+    total_applications: int
+    hired: int
+    internships: List[DashboardInternship]
+
 # --- Auth Schemas ---
 
 class Token(BaseModel):
@@ -231,6 +283,7 @@ class TokenData(BaseModel):
     email: Optional[str] = None
     id: Optional[int] = None
     role: Optional[str] = None
+    ver: int = 0 # User.token_version the token was issued for
 
 class LoginRequest(BaseModel):
     """Schema for user login request."""
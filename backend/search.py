@@ -0,0 +1,221 @@
+# backend/search.py
+
+import re
+
+from sqlalchemy import Integer, and_, column, false, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import models
+
+# Weight of the recency boost relative to the text rank, and how many days it
+# takes for a posting to lose half of that boost.
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 14.0
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+
+# --- Index installation ---
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE internships ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_internships_search_vector ON internships USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS internships_fts USING fts5(
+        title, description, location,
+        content='internships', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS internships_fts_ai AFTER INSERT ON internships BEGIN
+        INSERT INTO internships_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS internships_fts_ad AFTER DELETE ON internships BEGIN
+        INSERT INTO internships_fts(internships_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS internships_fts_au AFTER UPDATE ON internships BEGIN
+        INSERT INTO internships_fts(internships_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO internships_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+]
+
+def install(bind):
+    """
+    Creates the full-text index for internships. `bind` is an Engine or a
+    Connection, e.g. the one a migration runs on.
+    PostgreSQL gets a generated tsvector column with a GIN index, SQLite gets an
+    external-content FTS5 table kept in sync by triggers. Safe to run repeatedly.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return install(conn)
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            bind.execute(text(statement))
+    elif dialect == "sqlite":
+        existed = bind.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'internships_fts'")
+        ).first()
+        for statement in SQLITE_DDL:
+            bind.execute(text(statement))
+        if not existed:
+            # Index rows that were inserted before the triggers existed
+            bind.execute(text("INSERT INTO internships_fts(internships_fts) VALUES ('rebuild')"))
+
+def uninstall(bind):
+    """Drops what install() created."""
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return uninstall(conn)
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        bind.execute(text("DROP INDEX IF EXISTS ix_internships_search_vector"))
+        bind.execute(text("ALTER TABLE internships DROP COLUMN IF EXISTS search_vector"))
+    elif dialect == "sqlite":
+        for trigger in ("internships_fts_ai", "internships_fts_ad", "internships_fts_au"):
+            bind.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        bind.execute(text("DROP TABLE IF EXISTS internships_fts"))
+
+def is_supported(db: Session) -> bool:
+    """Whether the session's database has an index-backed search implementation."""
+    return db.bind.dialect.name in ("postgresql", "sqlite")
+
+# --- Querying ---
+
+def _tokens(search_query: str):
+    """Splits a user query into plain word tokens, dropping any query syntax."""
+    return re.findall(r"\w+", search_query.lower())
+
+def match_filter(db: Session, search_query: str, active_only: bool = False):
+    """
+    WHERE clause limiting internships to those search_internships would return
+    for `search_query`, for queries over the whole match set such as facet counts.
+    """
+    tokens = _tokens(search_query)
+    if not tokens:
+        return false()
+    if db.bind.dialect.name == "postgresql":
+        clause = text("internships.search_vector @@ to_tsquery('english', :tsquery)").bindparams(
+            tsquery=" & ".join(f"{token}:*" for token in tokens)
+        )
+    else:
+        matches = text("SELECT rowid FROM internships_fts WHERE internships_fts MATCH :match").bindparams(
+            match=" ".join(f'"{token}"*' for token in tokens)
+        ).columns(column("rowid", Integer))
+        clause = models.Internship.id.in_(matches)
+    if active_only:
+        clause = and_(clause, models.Internship.is_active == True)
+    return clause
+
+def _filters(db: Session, employer_id: int, active_only: bool):
+    """Extra WHERE conditions for the ranked search SQL, and their parameters."""
+    conditions, params = [], {}
+    if employer_id:
+        conditions.append("AND i.employer_id = :employer_id")
+        params["employer_id"] = employer_id
+    if active_only:
+        # Written like the predicate of ix_internships_active_posted_date so the
+        # planner can use the partial index
+        conditions.append("AND i.is_active = true" if db.bind.dialect.name == "postgresql" else "AND i.is_active = 1")
+    return " ".join(conditions), params
+
+def _postgres_sql(where: str):
+    return f"""
+        WITH q AS (SELECT to_tsquery('english', :tsquery) AS query),
+        ranked AS (
+            SELECT i.id,
+                   ts_rank_cd(i.search_vector, q.query) *
+                   (1 + :recency_weight / (1 + extract(epoch FROM (now() - i.posted_date)) / 86400.0 / :half_life))
+                   AS score
+            FROM internships i, q
+            WHERE i.search_vector @@ q.query {where}
+            ORDER BY score DESC, i.id DESC
+            LIMIT :limit OFFSET :skip
+        )
+        SELECT ranked.id, ranked.score,
+               ts_headline('english', i.description, q.query,
+                           'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=30, MinWords=10, MaxFragments=2')
+                   AS snippet
+        FROM ranked JOIN internships i ON i.id = ranked.id, q
+        ORDER BY ranked.score DESC, ranked.id DESC
+    """
+
+def _sqlite_sql(where: str):
+    return f"""
+        SELECT i.id,
+               -bm25(internships_fts, 10.0, 1.0, 5.0) *
+               (1 + :recency_weight / (1 + (julianday('now') - julianday(i.posted_date)) / :half_life))
+               AS score,
+               snippet(internships_fts, 1, '{SNIPPET_START}', '{SNIPPET_STOP}', '…', 16) AS snippet
+        FROM internships_fts JOIN internships i ON i.id = internships_fts.rowid
+        WHERE internships_fts MATCH :match {where}
+        ORDER BY score DESC, i.id DESC
+        LIMIT :limit OFFSET :skip
+    """
+
+def search_internships(db: Session, search_query: str, skip: int = 0, limit: int = 100, employer_id: int = None, active_only: bool = False):
+    """
+    Ranked full-text search over internship title, location and description.
+    Every term is matched as a prefix and all terms must match. The score is the
+    engine's text rank boosted by posting recency. Returned internships carry
+    transient `search_rank` and `snippet` attributes for the response schema.
+    With `active_only`, inactive internships are left out.
+    """
+    tokens = _tokens(search_query)
+    if not tokens:
+        return []
+
+    params = {
+        "recency_weight": RECENCY_WEIGHT,
+        "half_life": RECENCY_HALF_LIFE_DAYS,
+        "limit": limit,
+        "skip": skip,
+    }
+    where, filter_params = _filters(db, employer_id, active_only)
+    params.update(filter_params)
+
+    if db.bind.dialect.name == "postgresql":
+        sql = _postgres_sql(where)
+        params["tsquery"] = " & ".join(f"{token}:*" for token in tokens)
+    else:
+        sql = _sqlite_sql(where)
+        params["match"] = " ".join(f'"{token}"*' for token in tokens)
+
+    rows = db.execute(text(sql), params).all()
+    if not rows:
+        return []
+
+    internships = {
+        internship.id: internship
+        for internship in db.query(models.Internship).filter(models.Internship.id.in_([row.id for row in rows]))
+    }
+    results = []
+    for row in rows:
+        internship = internships.get(row.id)
+        if internship is None:
+            continue
+        internship.search_rank = float(row.score)
+        internship.snippet = row.snippet
+        results.append(internship)
+    return results
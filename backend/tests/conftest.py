@@ -0,0 +1,87 @@
+# backend/tests/conftest.py
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# The engine is built when `database` is first imported, so point it at a scratch
+# SQLite file (and switch off background work) before any backend import
+_scratch = tempfile.mkdtemp(prefix="iintern-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ["DB_MODE"] = "sync"
+os.environ["QUERY_STATS_ENABLED"] = "True"
+os.environ["RATE_LIMIT_ENABLED"] = "False"
+os.environ["EMAIL_DISPATCHER_ENABLED"] = "False"
+
+import pytest
+from sqlalchemy import event
+
+import auth, models, query_stats, search
+from database import Base, SessionLocal, engine
+from facet_cache import facet_cache
+from user_cache import user_cache
+
+query_stats.instrument(engine)
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables."""
+    search.uninstall(engine)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    search.install(engine)
+    # Row IDs restart with every test, so nothing cached per ID may survive
+    user_cache.clear()
+    facet_cache.invalidate()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def count_queries():
+    """
+    Context manager collecting the statements run inside it, as a
+    query_stats.RequestQueryStats whose `commits` is added here.
+    """
+    @contextmanager
+    def counting():
+        stats = query_stats.RequestQueryStats()
+        stats.commits = 0
+        def on_commit(conn):
+            stats.commits += 1
+        token = query_stats.current_stats.set(stats)
+        event.listen(engine, "commit", on_commit)
+        try:
+            yield stats
+        finally:
+            event.remove(engine, "commit", on_commit)
+            query_stats.current_stats.reset(token)
+    return counting
+
+@pytest.fixture
+def client(db):
+    """TestClient for the app; skipped where main cannot be imported (e.g. WeasyPrint without Pango)."""
+    try:
+        import main
+    except (ImportError, OSError) as e:
+        pytest.skip(f"main cannot be imported: {e}")
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_user(db):
+    """Factory for verified users committed to the test database."""
+    def make(email: str, role: str, **values) -> models.User:
+        user = models.User(email=email, hashed_password="x", role=role, is_verified=True, **values)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+@pytest.fixture
+def auth_headers():
+    """Factory for the Authorization header a user's login token would give."""
+    def headers(user: models.User) -> dict:
+        return {"Authorization": f"Bearer {auth.create_access_token(auth.token_claims(user))}"}
+    return headers
@@ -0,0 +1,76 @@
+# backend/tests/test_employer_queries.py
+
+import pytest
+
+import crud, models, pagination
+
+STATUSES = ["pending", "reviewed", "hired", "rejected"]
+
+def seed_employer(db, make_user, name: str, internships: int, applicants: int):
+    """An employer with `internships` postings, each applied to by `applicants` students."""
+    employer = make_user(f"{name}@example.com", "employer")
+    students = [make_user(f"{name}.student{i}@example.com", "student") for i in range(applicants)]
+    for n in range(internships):
+        internship = models.Internship(employer_id=employer.id, title=f"{name} intern {n}", description="x")
+        db.add(internship)
+        db.flush()
+        db.add_all([
+            models.Application(internship_id=internship.id, student_id=student.id, status=STATUSES[i % len(STATUSES)])
+            for i, student in enumerate(students)
+        ])
+    db.commit()
+    db.expunge_all()
+    return employer
+
+@pytest.fixture
+def employers(db, make_user):
+    """(small, large): one internship with one applicant, and 12 with 8 applicants each."""
+    return seed_employer(db, make_user, "small", 1, 1), seed_employer(db, make_user, "large", 12, 8)
+
+def queries(count_queries, fn) -> int:
+    with count_queries() as stats:
+        fn()
+    return stats.count
+
+def test_hired_applications_query_count_is_constant(db, employers, count_queries):
+    small, large = employers
+    assert crud.get_hired_applications(db, employer_id=small.id) == []
+    assert len(crud.get_hired_applications(db, employer_id=large.id)) == 12 * 2
+
+    assert queries(count_queries, lambda: crud.get_hired_applications(db, employer_id=small.id)) == 1
+    assert queries(count_queries, lambda: crud.get_hired_applications(db, employer_id=large.id)) == 1
+
+def test_hired_applications_pages_with_a_constant_query_count(db, employers, count_queries):
+    _, large = employers
+    seen, cursor = [], None
+    while True:
+        with count_queries() as stats:
+            page = crud.get_hired_applications(db, employer_id=large.id, limit=5, cursor=cursor)
+        assert stats.count == 1
+        seen.extend(application.id for application in page)
+        cursor = pagination.next_cursor(page, 5, crud.APPLICATION_PAGE_KEY)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 12 * 2
+
+def test_employer_dashboard_query_count_is_constant(db, employers, count_queries):
+    small, large = employers
+    small_dashboard = crud.get_employer_dashboard(db, employer_id=small.id)
+    large_dashboard = crud.get_employer_dashboard(db, employer_id=large.id)
+    assert [entry["total_applications"] for entry in small_dashboard] == [1]
+    assert [entry["total_applications"] for entry in large_dashboard] == [8] * 12
+    assert all(entry["hired"] == 2 for entry in large_dashboard)
+
+    small_queries = queries(count_queries, lambda: crud.get_employer_dashboard(db, employer_id=small.id))
+    large_queries = queries(count_queries, lambda: crud.get_employer_dashboard(db, employer_id=large.id))
+    assert small_queries == large_queries == 1
+
+@pytest.mark.parametrize("path", ["/hired-interns", "/employers/me/dashboard"])
+def test_endpoint_query_count_is_constant(client, employers, auth_headers, path):
+    small, large = employers
+    counts = []
+    for employer in (small, large):
+        response = client.get(path, headers=auth_headers(employer))
+        assert response.status_code == 200
+        counts.append(int(response.headers["X-DB-Queries"]))
+    assert counts[0] == counts[1]
@@ -0,0 +1,77 @@
+# backend/tests/test_fast_json.py
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import orjson
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import fast_json, models, schemas
+
+def response_model_json(schema, items):
+    """What FastAPI returns for `items` through response_model=List[schema]."""
+    return jsonable_encoder(TypeAdapter(List[schema]).validate_python(items, from_attributes=True))
+
+def fast_json_output(schema, items):
+    return orjson.loads(fast_json.encoder_for(schema).encode(items))
+
+@pytest.fixture
+def rows(db, make_user):
+    """Rows of each list schema as loaded from the database, plus transient ones with aware datetimes."""
+    employer = make_user("employer@example.com", "employer", first_name="Ada", bio="Hiring")
+    student = make_user("student@example.com", "student")
+    internships = [
+        models.Internship(employer_id=employer.id, title="Data Intern", description="SQL", location="Pune"),
+        models.Internship(
+            employer_id=employer.id, title="Design Intern", description="Figma", stipend="Paid", is_active=False,
+            deadline_date=datetime(2030, 1, 2, 3, 4, 5, 600000),
+        ),
+    ]
+    db.add_all(internships)
+    db.commit()
+    db.add(models.Application(internship_id=internships[0].id, student_id=student.id, cover_letter="Hello"))
+    db.commit()
+    db.expunge_all()
+
+    aware = datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc)
+    return {
+        schemas.UserResponse: db.query(models.User).all() + [
+            models.User(id=99, email="aware@example.com", role="admin", created_at=aware, updated_at=aware + timedelta(microseconds=5), credits=0, is_premium=True),
+        ],
+        schemas.InternshipSearchResponse: db.query(models.Internship).all() + [
+            models.Internship(id=99, employer_id=1, title="Aware", description="x", posted_date=aware, updated_at=aware, is_active=True),
+        ],
+        schemas.ApplicationResponse: db.query(models.Application).all() + [
+            models.Application(id=99, internship_id=1, student_id=2, status="hired", applied_date=aware),
+        ],
+        schemas.RecommendedInternship: db.query(models.Internship).all(),
+    }
+
+@pytest.mark.parametrize("schema", [
+    schemas.UserResponse, schemas.InternshipSearchResponse, schemas.ApplicationResponse, schemas.RecommendedInternship,
+])
+def test_fast_path_matches_response_model(rows, schema):
+    items = rows[schema]
+    if schema is schemas.InternshipSearchResponse:
+        items[0].search_rank, items[0].snippet = 0.5, "<mark>Data</mark> Intern"
+    if schema is schemas.RecommendedInternship:
+        for n, item in enumerate(items):
+            item.match_score = 0.9 - n / 10
+    assert fast_json_output(schema, items) == response_model_json(schema, items)
+
+def test_disabled_by_default(rows, monkeypatch):
+    items = rows[schemas.ApplicationResponse]
+    assert fast_json.FAST_JSON_ENABLED is False
+    assert fast_json.list_response(schemas.ApplicationResponse, items) is items
+    monkeypatch.setattr(fast_json, "FAST_JSON_ENABLED", True)
+    assert isinstance(fast_json.list_response(schemas.ApplicationResponse, items), fast_json.FastJSONResponse)
+
+def test_endpoint_responses_match(client, rows, monkeypatch):
+    default = client.get("/internships", params={"limit": 1})
+    monkeypatch.setattr(fast_json, "FAST_JSON_ENABLED", True)
+    fast = client.get("/internships", params={"limit": 1})
+    assert default.status_code == fast.status_code == 200
+    assert default.json() == fast.json()
+    assert default.headers["X-Next-Cursor"] == fast.headers["X-Next-Cursor"]
@@ -0,0 +1,66 @@
+# backend/tests/test_unit_of_work.py
+
+import asyncio
+
+import pytest
+
+import crud, crud_async, schemas
+
+# Statements and commits per flow. Raising one of these means an endpoint now
+# makes more round trips; lower it when a change saves one.
+REGISTER_OTP_STATEMENTS = 5 # user lookup, user + profile inserts, outbox insert, OTP update
+APPLY_STATEMENTS = 3 # credit debit, application insert, ledger insert
+
+PASSWORD = "Str0ng!Pw1"
+
+def register_otp(db, email: str, unit_of_work: bool):
+    """The crud calls behind /request-register-otp, with or without a unit of work."""
+    user_data = schemas.UserCreate(email=email, password=PASSWORD, role="student")
+    async def flow():
+        user = await crud_async.get_user_by_email(db, email=email)
+        if user is None:
+            user = await crud_async.create_user(db, user=user_data, hashed_password="x")
+        await crud_async.set_user_otp(db, user=user, otp="123456", email={"subject": "OTP", "body": "123456"})
+        return user
+    async def run():
+        if unit_of_work:
+            async with crud_async.transaction(db):
+                return await flow()
+        return await flow()
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("unit_of_work, commits", [(False, 2), (True, 1)])
+def test_register_otp_round_trips(db, count_queries, unit_of_work, commits):
+    with count_queries() as stats:
+        register_otp(db, "student@example.com", unit_of_work)
+    assert (stats.count, stats.commits) == (REGISTER_OTP_STATEMENTS, commits)
+
+@pytest.mark.parametrize("unit_of_work", [False, True])
+def test_apply_round_trips(db, make_user, count_queries, unit_of_work):
+    employer = make_user("employer@example.com", "employer")
+    student = make_user("student@example.com", "student")
+    internship = crud.create_internship(db, schemas.InternshipCreate(title="Intern", description="x"), employer_id=employer.id)
+    application = schemas.ApplicationCreate(internship_id=internship.id, cover_letter="Hello")
+    async def apply():
+        if unit_of_work:
+            async with crud_async.transaction(db):
+                return await crud_async.create_application(db, application=application, student_id=student.id, charge_credit=True)
+        return await crud_async.create_application(db, application=application, student_id=student.id, charge_credit=True)
+    with count_queries() as stats:
+        asyncio.run(apply())
+    assert (stats.count, stats.commits) == (APPLY_STATEMENTS, 1)
+
+def test_request_register_otp_endpoint(client, make_user, count_queries):
+    body = {"email": "new@example.com", "password": PASSWORD, "role": "student"}
+    # New user, then the same unverified user asking again
+    for _ in range(2):
+        with count_queries() as stats:
+            response = client.post("/request-register-otp", json=body)
+        assert response.status_code == 200
+        assert (int(response.headers["X-DB-Queries"]), stats.commits) == (REGISTER_OTP_STATEMENTS, 1)
+
+    make_user("verified@example.com", "student")
+    with count_queries() as stats:
+        response = client.post("/request-register-otp", json={**body, "email": "verified@example.com"})
+    assert response.status_code == 400
+    assert (int(response.headers["X-DB-Queries"]), stats.commits) == (1, 0)
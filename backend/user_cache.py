@@ -0,0 +1,67 @@
+# backend/user_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+import models
+
+# Entries are per process, so a change made on another worker is only seen here
+# after the TTL. Token revocation (token_version) has the same bound.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+
+class UserCache:
+    """
+    LRU cache of authenticated users' column values, with a TTL per entry.
+    Stores plain snapshots rather than ORM instances so each request gets its
+    own session-bound copy that it can modify and commit.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._columns = [attr.key for attr in sa_inspect(models.User).column_attrs]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, token_version: int):
+        """Snapshot for `user_id` if cached, fresh and issued for `token_version`."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic() or entry[1]["token_version"] != token_version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: models.User):
+        snapshot = {key: getattr(user, key) for key in self._columns}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def attach(db: Session, snapshot: dict) -> models.User:
+    """Turns a snapshot into a User bound to `db` without querying the database."""
+    user = models.User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES)
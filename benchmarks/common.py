@@ -0,0 +1,62 @@
+# benchmarks/common.py
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+WORDS = (
+    "python react data cloud backend frontend design marketing analytics sales "
+    "research machine learning finance content writing mobile android ios devops "
+    "security testing product operations support remote onsite startup api sql"
+).split()
+CITIES = ["Bangalore", "Mumbai", "Delhi", "Pune", "Hyderabad", "Chennai", "Remote"]
+
+def use_backend(database_url: str):
+    """
+    Points the backend at the given database and makes its modules importable.
+    Must be called before anything imports `database`, since the engine is
+    created at import time.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def seed_internships(db, count: int, employer_id: int, seed: int = 0):
+    """Inserts `count` synthetic internships with posting dates spread over a year."""
+    import models
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "employer_id": employer_id,
+            "title": sentence(rng, 3).title() + " Intern",
+            "description": sentence(rng, 80),
+            "requirements": sentence(rng, 15),
+            "location": rng.choice(CITIES),
+            "stipend": rng.choice(["Paid", "Unpaid", "10000", "20000"]),
+            "duration": rng.choice(["1 month", "3 months", "6 months"]),
+            "posted_date": now - timedelta(days=rng.uniform(0, 365)),
+            "is_active": rng.random() > 0.2,
+        }
+        for _ in range(count)
+    ]
+    db.bulk_insert_mappings(models.Internship, rows)
+    db.commit()
+
+def time_call(fn, repeat: int):
+    """Runs `fn` `repeat` times and returns (median, p95) latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.95))]
@@ -0,0 +1,44 @@
+# benchmarks/compare.py
+"""
+Side-by-side view of two benchmarks.load reports, e.g. before and after a change.
+Positive p95 deltas and negative throughput deltas are regressions.
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+
+def _delta(before, after) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before.get('commit')} -> {after.get('commit')} ({after.get('database')})")
+    header = f"{'scenario':<8} {'endpoint':<36} {'p95 ms':>18} {'Δp95':>8} {'req/s':>16} {'Δreq/s':>8}"
+    print(header)
+    print("-" * len(header))
+    for scenario, result in after["scenarios"].items():
+        old_endpoints = before.get("scenarios", {}).get(scenario, {}).get("endpoints", {})
+        for endpoint, new in result["endpoints"].items():
+            old = old_endpoints.get(endpoint, {})
+            p95 = f"{old.get('p95_ms', '-')} -> {new['p95_ms']}"
+            rps = f"{old.get('requests_per_second', '-')} -> {new['requests_per_second']}"
+            print(
+                f"{scenario:<8} {endpoint:<36} {p95:>18} {_delta(old.get('p95_ms'), new['p95_ms']):>8} "
+                f"{rps:>16} {_delta(old.get('requests_per_second'), new['requests_per_second']):>8}"
+            )
+
+if __name__ == "__main__":
+    main()
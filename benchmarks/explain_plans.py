@@ -0,0 +1,70 @@
+# benchmarks/explain_plans.py
+"""
+Prints the database's query plan for each hot-path crud query, so the effect
+of an index migration can be checked against real data. The SQL is captured
+from the crud functions themselves (paginate included), for the first page
+and for the page after it, which is what a keyset cursor asks for.
+
+    python -m benchmarks.explain_plans --database-url postgresql://localhost/iintern
+"""
+
+import argparse
+
+from sqlalchemy import event
+
+from benchmarks.common import use_backend
+
+def captured(engine, fn):
+    """The statements `fn` runs, as (sql, parameters) pairs."""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--employer-id", type=int, default=1)
+    parser.add_argument("--student-id", type=int, default=1)
+    parser.add_argument("--internship-id", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    use_backend(args.database_url)
+    import crud, pagination
+    from database import SessionLocal, engine
+
+    db = SessionLocal()
+    listings = {
+        "employer internships": (lambda **page: crud.get_internships(db, employer_id=args.employer_id, **page), crud.INTERNSHIP_PAGE_KEY),
+        "active internships": (lambda **page: crud.get_internships(db, active_only=True, **page), crud.INTERNSHIP_PAGE_KEY),
+        "student applications": (lambda **page: crud.get_applications_by_student(db, student_id=args.student_id, **page), crud.APPLICATION_PAGE_KEY),
+        "internship applicants": (lambda **page: crud.get_applications_by_internship(db, internship_id=args.internship_id, **page), crud.APPLICATION_PAGE_KEY),
+        "hired interns": (lambda **page: crud.get_hired_applications(db, employer_id=args.employer_id, **page), crud.APPLICATION_PAGE_KEY),
+    }
+    queries = {}
+    for name, (fetch, key) in listings.items():
+        page = fetch(limit=args.limit)
+        queries[name] = captured(engine, lambda: fetch(limit=args.limit))
+        if page:
+            cursor = pagination.encode_cursor([getattr(page[-1], attribute) for attribute in key])
+            queries[f"{name}, next page"] = captured(engine, lambda: fetch(limit=args.limit, cursor=cursor))
+    queries["employer dashboard"] = captured(engine, lambda: crud.get_employer_dashboard(db, employer_id=args.employer_id))
+
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        for name, statements in queries.items():
+            for sql, parameters in statements:
+                print(f"## {name}\n{sql}\n{parameters}\n")
+                for row in conn.exec_driver_sql(explain + sql, parameters):
+                    print("  ", row[-1] if engine.dialect.name == "sqlite" else row[0])
+                print()
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/json_encoding.py
+"""
+Serialization cost of one list page: FastAPI's response_model path (validate
+every item, dump to Python, stdlib json) against fast_json's direct ORM-to-orjson
+encoding and its prebuilt-TypeAdapter fallback, for the schemas behind
+/internships, /admin/users and /students/me/applications. The API only uses the
+fast path with FAST_JSON_ENABLED=True.
+
+    python -m benchmarks.json_encoding --rows 100 --repeat 500
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import use_backend, sentence, CITIES, time_call
+
+def build_rows(models, count: int, rng: random.Random):
+    """Transient ORM objects shaped like real rows; no database is touched."""
+    now = datetime.now(timezone.utc)
+    internships = [
+        models.Internship(
+            id=i, employer_id=1, title=sentence(rng, 3).title(), description=sentence(rng, 80),
+            requirements=sentence(rng, 15), location=rng.choice(CITIES), stipend="Paid", duration="3 months",
+            posted_date=now - timedelta(days=rng.uniform(0, 365)), updated_at=now, version=1, is_active=True,
+        )
+        for i in range(count)
+    ]
+    users = [
+        models.User(
+            id=i, email=f"user{i}@example.com", role="student", first_name="Test", last_name=f"User {i}",
+            bio=sentence(rng, 20), created_at=now, credits=5, is_premium=False,
+        )
+        for i in range(count)
+    ]
+    applications = [
+        models.Application(
+            id=i, internship_id=i, student_id=1, cover_letter=sentence(rng, 60), status="pending", applied_date=now,
+        )
+        for i in range(count)
+    ]
+    return internships, users, applications
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    use_backend("sqlite://")
+    from fastapi.responses import JSONResponse
+    import models, schemas, fast_json
+
+    internships, users, applications = build_rows(models, args.rows, random.Random(0))
+    cases = [
+        ("/internships", schemas.InternshipSearchResponse, internships),
+        ("/admin/users", schemas.UserResponse, users),
+        ("/students/me/applications", schemas.ApplicationResponse, applications),
+    ]
+
+    results = []
+    for endpoint, schema, items in cases:
+        encoder = fast_json.encoder_for(schema)
+
+        def response_model_path():
+            content = encoder.adapter.dump_python(encoder.adapter.validate_python(items, from_attributes=True), mode="json")
+            return JSONResponse(content).body
+
+        # Both paths must produce the same document
+        assert json.loads(response_model_path()) == json.loads(encoder.encode(items)), endpoint
+
+        baseline = time_call(response_model_path, args.repeat)
+        adapter = time_call(lambda: encoder.validated(items), args.repeat)
+        fast = time_call(lambda: encoder.encode(items), args.repeat)
+        results.append({
+            "endpoint": endpoint,
+            "rows": args.rows,
+            "response_model_p50_ms": round(baseline[0], 3),
+            "type_adapter_p50_ms": round(adapter[0], 3),
+            "orjson_direct_p50_ms": round(fast[0], 3),
+            "speedup": round(baseline[0] / fast[0], 1) if fast[0] else None,
+        })
+    print(json.dumps({"results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# benchmarks/load.py
+"""
+Load benchmark for the API. Migrates and seeds a database, starts `main:app`
+under uvicorn against it with SMTP pointed at a local stub, drives scripted
+scenarios with concurrent clients and prints per-endpoint latency percentiles
+and throughput as JSON. Save the output of two commits and diff them with
+benchmarks.compare.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load --database-url sqlite:///bench_load.db --output before.json
+    python -m benchmarks.load --database-url postgresql://localhost/bench --clients 64 --duration 30
+    python -m benchmarks.load --scenarios browse search --students 10000 --internships 100000
+
+The database is reset (alembic downgrade base, upgrade head) on every run, so
+never point it at one that matters.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BACKEND_DIR, WORDS, use_backend
+from benchmarks.seed import SEED_PASSWORD, seed_dataset
+from benchmarks.smtp_stub import SMTPStub
+
+RESUME = {
+    "personalInfo": {"fullName": "Bench Student", "email": "student0@bench.example.com", "phone": "0000000000"},
+    "objective": "Benchmarking the resume renderer.",
+    "education": [{"degree": "B.Tech", "college": "Bench College", "cgpa": "9.0", "startDate": "2022", "endDate": "2026"}],
+    "projects": [{"id": "1", "title": "Load tests", "description": "Measured things.", "techStack": ["python"]}],
+    "experience": [{
+        "id": "1", "role": "Intern", "company": "Bench Co", "startDate": "2025", "endDate": "2025",
+        "responsibilities": ["Ran benchmarks", "Compared commits"],
+    }],
+    "skills": ["python", "sql"],
+    "certifications": [{"id": "1", "name": "Benchmarking", "institution": "Bench", "year": "2025"}],
+}
+
+# --- Measurement ---
+
+class Recorder:
+    """Latency samples and status codes per endpoint label."""
+
+    def __init__(self):
+        self.samples = {}
+        self.statuses = {}
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.samples.setdefault(endpoint, []).append(seconds * 1000)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            samples.sort()
+            def percentile(p):
+                return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+            report[endpoint] = {
+                "requests": len(samples),
+                "requests_per_second": round(len(samples) / elapsed, 1),
+                "p50_ms": percentile(0.50),
+                "p95_ms": percentile(0.95),
+                "p99_ms": percentile(0.99),
+                "statuses": {str(status): count for status, count in sorted(self.statuses[endpoint].items())},
+            }
+        return report
+
+async def timed(recorder: Recorder, endpoint: str, request):
+    start = time.perf_counter()
+    response = await request
+    recorder.record(endpoint, time.perf_counter() - start, response.status_code)
+    return response
+
+# --- Scenarios ---
+# Each scenario is a `setup(client, dataset)` coroutine returning per-run state and
+# a `step(client, state, rng, recorder)` coroutine that one client runs in a loop.
+
+async def login(client, email: str) -> dict:
+    response = await client.post("/login", json={"email": email, "password": SEED_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def no_setup(client, dataset):
+    return dataset
+
+async def browse(client, state, rng, recorder):
+    response = await timed(recorder, "GET /internships", client.get("/internships", params={"limit": 20, "active_only": True}))
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor:
+        await timed(recorder, "GET /internships?cursor", client.get("/internships", params={"limit": 20, "cursor": cursor, "active_only": True}))
+    internship_id = rng.choice(state["internships"])
+    await timed(recorder, "GET /internships/{id}", client.get(f"/internships/{internship_id}"))
+
+async def search(client, state, rng, recorder):
+    query = " ".join(rng.sample(WORDS, 2))
+    await timed(recorder, "GET /internships?search_query", client.get("/internships", params={"search_query": query, "limit": 20}))
+
+async def login_burst(client, state, rng, recorder):
+    email = rng.choice(state["students"])
+    await timed(recorder, "POST /login", client.post("/login", json={"email": email, "password": SEED_PASSWORD}))
+
+async def students_setup(client, dataset, count: int = 50):
+    emails = dataset["students"][:count]
+    return {**dataset, "tokens": [await login(client, email) for email in emails]}
+
+async def apply_burst(client, state, rng, recorder):
+    headers = rng.choice(state["tokens"])
+    internship_id = rng.choice(state["internships"])
+    await timed(
+        recorder, "POST /internships/{id}/apply",
+        client.post(f"/internships/{internship_id}/apply", json={"cover_letter": "Benchmark application"}, headers=headers),
+    )
+    await timed(recorder, "GET /students/me/applications", client.get("/students/me/applications", params={"limit": 20}, headers=headers))
+
+async def employers_setup(client, dataset, count: int = 20):
+    employers = [(email, ids) for email, ids in dataset["employers"].items() if ids][:count]
+    return {**dataset, "employer_sessions": [(await login(client, email), ids) for email, ids in employers]}
+
+async def review_applicants(client, state, rng, recorder):
+    headers, internship_ids = rng.choice(state["employer_sessions"])
+    internship_id = rng.choice(internship_ids)
+    response = await timed(
+        recorder, "GET /internships/{id}/applicants",
+        client.get(f"/internships/{internship_id}/applicants", params={"limit": 20}, headers=headers),
+    )
+    applications = response.json() if response.status_code == 200 else []
+    if applications:
+        application = rng.choice(applications)
+        await timed(
+            recorder, "PUT /applications/{id}/status",
+            client.put(f"/applications/{application['id']}/status", params={"new_status": "reviewed"}, headers=headers),
+        )
+    await timed(recorder, "GET /hired-interns", client.get("/hired-interns", params={"limit": 20}, headers=headers))
+
+async def resume_pdf(client, state, rng, recorder):
+    headers = rng.choice(state["tokens"])
+    await timed(recorder, "POST /generate-resume", client.post("/generate-resume", json=RESUME, headers=headers))
+
+SCENARIOS = {
+    "browse": (no_setup, browse),
+    "search": (no_setup, search),
+    "login": (no_setup, login_burst),
+    "apply": (students_setup, apply_burst),
+    "review": (employers_setup, review_applicants),
+    "resume": (students_setup, resume_pdf),
+}
+
+async def run_scenario(base_url: str, name: str, dataset: dict, clients: int, duration: float, seed: int) -> dict:
+    import httpx
+
+    setup, step = SCENARIOS[name]
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        state = await setup(client, dataset)
+        recorder = Recorder()
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int):
+            rng = random.Random(seed * 1000 + n)
+            while time.perf_counter() < deadline:
+                await step(client, state, rng, recorder)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.perf_counter() - start
+    return {"clients": clients, "duration_seconds": round(elapsed, 2), "endpoints": recorder.report(elapsed)}
+
+# --- Server ---
+
+def migrate(env: dict):
+    for args in (["downgrade", "base"], ["upgrade", "head"]):
+        subprocess.run([sys.executable, "-m", "alembic", *args], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+def start_server(env: dict, port: int, workers: int) -> subprocess.Popen:
+    import httpx
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 60 seconds")
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_load.db")
+    parser.add_argument("--employers", type=int, default=50)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--internships", type=int, default=5000)
+    parser.add_argument("--applications", type=int, default=20000)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    smtp = SMTPStub()
+    smtp_port = smtp.start_in_thread()
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "SECRET_KEY": os.getenv("SECRET_KEY", "bench-secret-key"),
+        "ALGORITHM": os.getenv("ALGORITHM", "HS256"),
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": str(smtp_port),
+        "MAIL_USERNAME": "",
+        "MAIL_PASSWORD": "",
+        "MAIL_FROM": "bench@example.com",
+        "MAIL_STARTTLS": "False",
+        "MAIL_SSL_TLS": "False",
+        # The login scenario is a burst from one IP; measure bcrypt, not the limiter
+        "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "False"),
+    }
+    os.environ.update(env)
+    migrate(env)
+
+    use_backend(args.database_url)
+    from database import SessionLocal, engine
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        dataset = seed_dataset(db, args.employers, args.students, args.internships, args.applications, seed=args.seed)
+        seed_seconds = time.perf_counter() - started
+    finally:
+        db.close()
+
+    server = start_server(env, args.port, args.workers)
+    try:
+        results = {}
+        for name in args.scenarios:
+            results[name] = asyncio.run(
+                run_scenario(f"http://127.0.0.1:{args.port}", name, dataset, args.clients, args.duration, args.seed)
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    report = {
+        "commit": git_commit(),
+        "database": engine.dialect.name,
+        "scale": {
+            "employers": args.employers, "students": args.students,
+            "internships": args.internships, "applications": args.applications,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "workers": args.workers,
+        "emails_received": smtp.received,
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
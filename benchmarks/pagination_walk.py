@@ -0,0 +1,102 @@
+# benchmarks/pagination_walk.py
+"""
+Regression check for keyset pagination: follows the next-page cursor through
+every page of the internship and application listings and fails unless each
+row is returned exactly once, in order. The data mixes rows stamped by the
+column defaults (models.utc_now) with rows given explicit timestamps, including
+several in the same whole second; SQLite cursors once stalled on such rows.
+
+    python -m benchmarks.pagination_walk
+    python -m benchmarks.pagination_walk --database-url postgresql://localhost/bench --page-size 3
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import use_backend
+
+def walk(fetch, limit: int, key, next_cursor):
+    """All rows of a listing, following cursors until a page comes back short."""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        rows.extend(page)
+        pages += 1
+        cursor = next_cursor(page, limit, key)
+        if cursor is None:
+            return rows
+        if pages > 10000:
+            raise AssertionError("cursor never reached the last page")
+
+def check(name: str, rows, expected_ids, key) -> bool:
+    ids = [row.id for row in rows]
+    sort_keys = [tuple(getattr(row, attribute) for attribute in key) for row in rows]
+    problems = []
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} rows returned twice")
+    if set(ids) != set(expected_ids):
+        problems.append(f"{len(set(expected_ids) - set(ids))} rows never returned")
+    if any(later > earlier for earlier, later in zip(sort_keys, sort_keys[1:])):
+        problems.append("rows out of order")
+    print(f"{name}: {len(ids)} rows" + (f" - FAILED: {'; '.join(problems)}" if problems else " - ok"))
+    return not problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_pagination.db")
+    parser.add_argument("--page-size", type=int, default=5)
+    args = parser.parse_args()
+
+    use_backend(args.database_url)
+    import models, crud, pagination
+    from database import engine, Base, SessionLocal
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    employer = models.User(email="bench.employer@example.com", hashed_password="x", role="employer")
+    student = models.User(email="bench.student@example.com", hashed_password="x", role="student")
+    db.add_all([employer, student])
+    db.commit()
+
+    # Database-stamped rows: posted_date comes from the column default
+    db.execute(insert(models.Internship), [
+        {"employer_id": employer.id, "title": f"Server stamped {i}", "description": "x"} for i in range(12)
+    ])
+    # Explicit rows: whole seconds (ties among themselves), and fractional seconds
+    whole_second = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=1)
+    db.execute(insert(models.Internship), [
+        {"employer_id": employer.id, "title": f"Explicit {i}", "description": "x",
+         "posted_date": whole_second - timedelta(seconds=i // 3, microseconds=(i % 2) * 250000)}
+        for i in range(11)
+    ])
+    db.commit()
+    internship_ids = [internship.id for internship in db.query(models.Internship)]
+    db.execute(insert(models.Application), [
+        {"internship_id": internship_id, "student_id": student.id} for internship_id in internship_ids
+    ])
+    db.commit()
+
+    ok = check(
+        "internships",
+        walk(lambda **page: crud.get_internships(db, **page), args.page_size, crud.INTERNSHIP_PAGE_KEY, pagination.next_cursor),
+        internship_ids, crud.INTERNSHIP_PAGE_KEY,
+    )
+    ok &= check(
+        "active internships",
+        walk(lambda **page: crud.get_internships(db, active_only=True, **page), args.page_size, crud.INTERNSHIP_PAGE_KEY, pagination.next_cursor),
+        internship_ids, crud.INTERNSHIP_PAGE_KEY,
+    )
+    ok &= check(
+        "student applications",
+        walk(lambda **page: crud.get_applications_by_student(db, student_id=student.id, **page), args.page_size, crud.APPLICATION_PAGE_KEY, pagination.next_cursor),
+        [application.id for application in db.query(models.Application)], crud.APPLICATION_PAGE_KEY,
+    )
+    db.close()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/recommendation_latency.py
+"""
+Skill-match recommendation cost versus catalog size: building the TF-IDF index
+(recommendations.py), top-k scoring, incremental re-indexing of an edited
+posting, and the full crud.recommend_internships call including the row fetch.
+
+    python -m benchmarks.recommendation_latency --database-url sqlite:///bench_recommend.db
+    python -m benchmarks.recommendation_latency --sizes 10000 50000 --k 20
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import use_backend, seed_internships, sentence, time_call
+
+PROFILES = [
+    "python, sql, data analytics, machine learning",
+    "react, frontend, design, mobile",
+    '["devops", "cloud", "security", "backend api"]',
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_recommend.db")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    use_backend(args.database_url)
+    from sqlalchemy import select
+    import models, schemas, crud, recommendations
+    from database import engine, Base, SessionLocal
+
+    results = []
+    loaded = 0
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    employer = models.User(email="bench.employer@example.com", hashed_password="x", role="employer")
+    student = models.User(email="bench.student@example.com", hashed_password="x", role="student")
+    db.add_all([employer, student])
+    db.commit()
+    profile = models.StudentProfile(user_id=student.id, skills=PROFILES[0], experience="Built data pipelines in python")
+    db.add(profile)
+    db.commit()
+    rng = random.Random(0)
+
+    for size in sorted(args.sizes):
+        seed_internships(db, size - loaded, employer_id=employer.id, seed=size)
+        loaded = size
+        ids = list(db.scalars(select(models.Internship.id)))
+
+        # A fresh index, as a worker would build on its first recommendation request
+        recommendations.index = recommendations.SkillIndex()
+        start = time.perf_counter()
+        recommendations.index.refresh(db)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        queries = [recommendations.profile_text(text) for text in PROFILES]
+        top_k = time_call(lambda: recommendations.index.top_k(rng.choice(queries), args.k), args.repeat)
+
+        def edit():
+            update = schemas.InternshipUpdate(title=sentence(rng, 3).title(), description=sentence(rng, 80))
+            crud.update_internship(db, rng.choice(ids), update)
+        reindex = time_call(edit, args.repeat)
+
+        end_to_end = time_call(lambda: crud.recommend_internships(db, student_id=student.id, limit=args.k), args.repeat)
+        db.expunge_all()
+        results.append({
+            "catalog_size": size,
+            "build_ms": round(build_ms, 1),
+            "top_k_p50_ms": round(top_k[0], 3),
+            "top_k_p95_ms": round(top_k[1], 3),
+            "update_and_reindex_p50_ms": round(reindex[0], 3),
+            "update_and_reindex_p95_ms": round(reindex[1], 3),
+            "recommend_p50_ms": round(end_to_end[0], 3),
+            "recommend_p95_ms": round(end_to_end[1], 3),
+        })
+    db.close()
+    print(json.dumps({"dialect": engine.dialect.name, "k": args.k, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/round_trips.py
+"""
+Database round trips per endpoint flow, with each crud mutator committing on its
+own versus the whole flow inside one crud_async.transaction() unit of work.
+A round trip is one executed statement or one COMMIT/ROLLBACK.
+
+    python -m benchmarks.round_trips --database-url sqlite:///bench_round_trips.db
+"""
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.common import use_backend
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_round_trips.db")
+    args = parser.parse_args()
+
+    use_backend(args.database_url)
+    from sqlalchemy import event
+    import schemas, crud, crud_async
+    from database import engine, Base, SessionLocal
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    counter = {"round_trips": 0}
+    def count(*_):
+        counter["round_trips"] += 1
+    event.listen(engine, "before_cursor_execute", count)
+    event.listen(engine, "commit", count)
+    event.listen(engine, "rollback", count)
+
+    setup = SessionLocal()
+    employer = crud.create_user(setup, schemas.UserCreate(email="bench.employer@example.com", password="x", role="employer"), hashed_password="x")
+    internship = crud.create_internship(setup, schemas.InternshipCreate(title="Bench Intern", description="Benchmark"), employer_id=employer.id)
+    setup.close()
+
+    async def register_otp(db, n, unit_of_work):
+        user_data = schemas.UserCreate(email=f"bench.{unit_of_work}.{n}@example.com", password="x", role="student")
+        async def flow():
+            user = await crud_async.get_user_by_email(db, email=user_data.email)
+            if user is None:
+                user = await crud_async.create_user(db, user=user_data, hashed_password="x")
+            await crud_async.set_user_otp(db, user=user, otp="123456", email={"subject": "OTP", "body": "123456"})
+            return user
+        if unit_of_work:
+            async with crud_async.transaction(db):
+                return await flow()
+        return await flow()
+
+    async def apply(db, student, unit_of_work):
+        application = schemas.ApplicationCreate(internship_id=internship.id, cover_letter="Hello")
+        if unit_of_work:
+            async with crud_async.transaction(db):
+                return await crud_async.create_application(db, application=application, student_id=student.id, charge_credit=True)
+        return await crud_async.create_application(db, application=application, student_id=student.id, charge_credit=True)
+
+    async def measure(flow, *flow_args):
+        db = SessionLocal()
+        try:
+            before = counter["round_trips"]
+            result = await flow(db, *flow_args)
+            return counter["round_trips"] - before, result
+        finally:
+            db.close()
+
+    async def run():
+        results = []
+        for n, unit_of_work in enumerate((False, True)):
+            trips, student = await measure(register_otp, n, unit_of_work)
+            results.append({"flow": "request-register-otp", "unit_of_work": unit_of_work, "round_trips": trips})
+            trips, _ = await measure(apply, student, unit_of_work)
+            results.append({"flow": "apply", "unit_of_work": unit_of_work, "round_trips": trips})
+        return results
+
+    results = asyncio.run(run())
+    print(json.dumps({"dialect": engine.dialect.name, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
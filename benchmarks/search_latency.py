@@ -0,0 +1,73 @@
+# benchmarks/search_latency.py
+"""
+Search latency versus catalog size: full-text index (search.py) against the
+previous ILIKE scan (crud.get_internships_ilike), plus facet counts for the same
+queries (crud.get_internship_facets) and for the uncached unfiltered listing.
+
+    python -m benchmarks.search_latency --database-url sqlite:///bench_search.db
+    python -m benchmarks.search_latency --database-url postgresql://localhost/bench --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+
+from benchmarks.common import use_backend, seed_internships, time_call
+
+QUERIES = ["python", "machine learning", "remote devops", "data analytics bangalore"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_search.db")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    use_backend(args.database_url)
+    import models, crud, search
+    from facet_cache import facet_cache
+    from database import engine, Base, SessionLocal
+
+    results = []
+    loaded = 0
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    search.install(engine)
+    db = SessionLocal()
+    employer = models.User(email="bench.employer@example.com", hashed_password="x", role="employer")
+    db.add(employer)
+    db.commit()
+
+    for size in sorted(args.sizes):
+        seed_internships(db, size - loaded, employer_id=employer.id, seed=size)
+        loaded = size
+        for query in QUERIES:
+            fts = time_call(lambda: crud.get_internships(db, limit=args.limit, search_query=query), args.repeat)
+            ilike = time_call(lambda: crud.get_internships_ilike(db, limit=args.limit, search_query=query), args.repeat)
+            facets = time_call(lambda: crud.get_internship_facets(db, search_query=query), args.repeat)
+            db.expunge_all()
+            results.append({
+                "catalog_size": size,
+                "query": query,
+                "fts_p50_ms": round(fts[0], 3),
+                "fts_p95_ms": round(fts[1], 3),
+                "ilike_p50_ms": round(ilike[0], 3),
+                "ilike_p95_ms": round(ilike[1], 3),
+                "facets_p50_ms": round(facets[0], 3),
+                "facets_p95_ms": round(facets[1], 3),
+            })
+        def unfiltered_facets():
+            facet_cache.invalidate()
+            crud.get_internship_facets(db)
+        facets = time_call(unfiltered_facets, args.repeat)
+        results.append({
+            "catalog_size": size,
+            "query": None,
+            "facets_p50_ms": round(facets[0], 3),
+            "facets_p95_ms": round(facets[1], 3),
+        })
+    db.close()
+    print(json.dumps({"dialect": engine.dialect.name, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
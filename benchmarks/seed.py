@@ -0,0 +1,89 @@
+# benchmarks/seed.py
+"""
+Synthetic dataset for the load benchmark: employers, students, internships and
+applications at a configurable scale. Every seeded account shares one password
+so scenarios can log in as anyone.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import sentence, CITIES
+
+SEED_PASSWORD = "Bench-Password-1"
+# Students get enough credits that apply bursts measure the apply path, not the 403
+SEED_CREDITS = 1_000_000
+BATCH_SIZE = 5000
+
+def student_email(n: int) -> str:
+    return f"student{n}@bench.example.com"
+
+def employer_email(n: int) -> str:
+    return f"employer{n}@bench.example.com"
+
+def _insert(db, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.bulk_insert_mappings(model, rows[start:start + BATCH_SIZE])
+    db.commit()
+
+def seed_dataset(db, employers: int, students: int, internships: int, applications: int, seed: int = 0) -> dict:
+    """
+    Inserts the dataset and returns what scenarios need to address it: the
+    account emails and the internships each employer owns.
+    """
+    import models
+    from auth import get_password_hash
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    hashed_password = get_password_hash(SEED_PASSWORD) # Hashed once; bcrypt would dominate seeding
+
+    def user(email, role):
+        return {
+            "email": email, "hashed_password": hashed_password, "role": role, "is_verified": True,
+            "first_name": "Bench", "last_name": role.title(), "credits": SEED_CREDITS, "is_premium": False,
+        }
+
+    _insert(db, models.User, [user(employer_email(n), "employer") for n in range(employers)])
+    _insert(db, models.User, [user(student_email(n), "student") for n in range(students)])
+    employer_ids = [row.id for row in db.query(models.User.id).filter(models.User.role == "employer").order_by(models.User.id)]
+    student_ids = [row.id for row in db.query(models.User.id).filter(models.User.role == "student").order_by(models.User.id)]
+
+    _insert(db, models.Internship, [
+        {
+            "employer_id": rng.choice(employer_ids),
+            "title": sentence(rng, 3).title() + " Intern",
+            "description": sentence(rng, 80),
+            "requirements": sentence(rng, 15),
+            "location": rng.choice(CITIES),
+            "stipend": rng.choice(["Paid", "Unpaid", "10000", "20000"]),
+            "duration": rng.choice(["1 month", "3 months", "6 months"]),
+            "posted_date": now - timedelta(days=rng.uniform(0, 365)),
+            "updated_at": now,
+            "is_active": rng.random() > 0.2,
+        }
+        for _ in range(internships)
+    ])
+    owned = {}
+    for row in db.query(models.Internship.id, models.Internship.employer_id):
+        owned.setdefault(row.employer_id, []).append(row.id)
+    internship_ids = [internship_id for ids in owned.values() for internship_id in ids]
+
+    applications = min(applications, len(internship_ids) * len(student_ids))
+    pairs = set()
+    while len(pairs) < applications:
+        pairs.add((rng.choice(internship_ids), rng.choice(student_ids)))
+    _insert(db, models.Application, [
+        {
+            "internship_id": internship_id, "student_id": student_id, "cover_letter": sentence(rng, 40),
+            "status": rng.choice(["pending", "pending", "reviewed", "rejected"]),
+            "applied_date": now - timedelta(days=rng.uniform(0, 90)),
+        }
+        for internship_id, student_id in pairs
+    ])
+
+    return {
+        "students": [student_email(n) for n in range(students)],
+        "employers": {employer_email(n): owned.get(employer_id, []) for n, employer_id in enumerate(employer_ids)},
+        "internships": internship_ids,
+    }
@@ -0,0 +1,87 @@
+# benchmarks/smtp_stub.py
+"""
+Local SMTP sink so benchmarked servers never send real mail. Speaks just enough
+SMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for aiosmtplib, accepts
+every message and only counts them.
+
+    python -m benchmarks.smtp_stub --port 1025
+"""
+
+import argparse
+import asyncio
+import threading
+
+class SMTPStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.received = 0
+        self._loop = None
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def reply(line: str):
+            writer.write((line + "\r\n").encode())
+
+        reply("220 bench-smtp ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith("EHLO"):
+                    reply("250-bench-smtp")
+                    reply("250 8BITMIME")
+                elif command.startswith("DATA"):
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    self.received += 1
+                    reply("250 OK")
+                elif command.startswith("QUIT"):
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else: # HELO, MAIL, RCPT, RSET, NOOP
+                    reply("250 OK")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> int:
+        """Serves on a daemon thread and returns the bound port."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._bind(ready))
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="smtp-stub", daemon=True).start()
+        ready.wait()
+        return self.port
+
+    async def _bind(self, ready: threading.Event):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    stub = SMTPStub(args.host, args.port)
+    print(f"SMTP stub listening on {args.host}:{args.port}")
+    asyncio.run(stub.serve())
+
+if __name__ == "__main__":
+    main()